@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Параметр списка админки, по которому количество записей считается точно: ?exact_count=1
+EXACT_COUNT_VAR = 'exact_count'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки для больших таблиц.
+
+    Для выборки без условий количество строк берется из статистики PostgreSQL (pg_class.reltuples)
+    вместо COUNT(*) по всей таблице. Оценка используется, начиная с ADMIN_ESTIMATED_COUNT_THRESHOLD
+    строк; отфильтрованные выборки, другие СУБД и запрос с exact=True считаются точно.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, exact=False):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.exact = exact
+
+    @cached_property
+    def count(self):
+        estimate = None if self.exact else self.estimate_count()
+        if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+    def estimate_count(self):
+        if not self.is_unfiltered():
+            return None
+        return self.table_estimate(connections[self.object_list.db], self.object_list.model._meta.db_table)
+
+    def is_unfiltered(self):
+        """
+        Выборка без условий, кроме базового фильтра менеджера модели по умолчанию (например,
+        скрытия удаленных модулей): ее размер близок к числу строк таблицы.
+        """
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.distinct or query.is_sliced:
+            return False
+        return not query.where or query.where == query.model._default_manager.all().query.where
+
+    @staticmethod
+    def table_estimate(connection, table):
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+        # -1 — таблица еще не анализировалась
+        return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountChangeList(ChangeList):
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(EXACT_COUNT_VAR, None)
+        return lookup_params
+
+
+class EstimatedCountAdminMixin:
+    """
+    Список без точного COUNT(*): приблизительное количество строк и без второго подсчета
+    по всей таблице (show_full_result_count). Точное количество — по ссылке с ?exact_count=1.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page, exact=EXACT_COUNT_VAR in request.GET
+        )
@@ -1,11 +1,23 @@
 from __future__ import absolute_import, unicode_literals
+import logging
 import os
+import sys
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 from django.conf import settings
 
 # Установка переменной окружения DJANGO_SETTINGS_MODULE, чтобы Celery знал, какие настройки Django использовать.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
+# Процессы Celery получают собственный размер пула соединений с БД (POSTGRES_POOL_SIZES['celery'])
+# и набор приложений своей роли (ROLE_EXCLUDED_APPS): `celery beat` — роль beat, остальные — celery.
+# Модуль импортируется раньше настроек Django, поэтому переменная окружения успевает их изменить;
+# веб-процесс, который загружает модуль при постановке задачи, свою роль сохраняет.
+if not settings.configured:
+    os.environ.setdefault('PROCESS_ROLE', 'beat' if 'beat' in sys.argv[1:] else 'celery')
+
+logger = logging.getLogger(__name__)
+
 # Создание экземпляра Celery с именем проекта
 app = Celery('config')
 
@@ -19,3 +31,19 @@ app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
+
+
+@worker_init.connect
+def reset_db_pools(**kwargs):
+    # Дочерние процессы prefork не должны унаследовать пул, созданный главным процессом до fork
+    from config.db import close_pools
+
+    close_pools()
+
+
+@worker_process_shutdown.connect
+def log_db_pool_stats(**kwargs):
+    # Статистика ожидания соединений за время жизни процесса — для подбора размера пула
+    from config.db import get_pool_stats
+
+    logger.info('DB pool stats: %s', get_pool_stats())
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import connections
+
+
+def used_aliases():
+    """
+    Псевдонимы БД, с которыми работает приложение: основная и реплики из DATABASE_REPLICAS.
+    Псевдоним replica без настроенных реплик только занимает место в DATABASES (см. settings)
+    и не должен открывать пул к основной БД.
+    """
+    return [alias for alias in ('default', *settings.DATABASE_REPLICAS) if alias in connections]
+
+
+def get_pool_stats():
+    """
+    Возвращает состояние подключений к БД текущего процесса по каждому псевдониму.
+
+    В режиме pool в ответ попадает статистика psycopg_pool: `requests_wait_ms` — суммарное
+    время ожидания свободного соединения, `requests_waiting` — запросы в очереди сейчас,
+    `pool_size`/`pool_available` — открытые и свободные соединения.
+    """
+    stats = {}
+    for alias in used_aliases():
+        connection = connections[alias]
+        item = {'role': settings.PROCESS_ROLE, 'mode': settings.POSTGRES_POOL_MODE, 'vendor': connection.vendor}
+        if connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            item['pool'] = connection.pool.get_stats()
+        else:
+            item['conn_max_age'] = connection.settings_dict['CONN_MAX_AGE']
+        stats[alias] = item
+    return stats
+
+
+def close_pools():
+    """
+    Закрывает пулы соединений текущего процесса.
+
+    Вызывается в главном процессе воркера Celery до запуска дочерних процессов prefork, чтобы
+    они не унаследовали открытых соединений: закрыть пул после fork нельзя — сокеты общие
+    с родителем, и завершение сессий оборвало бы его соединения. Главный процесс задачи
+    не выполняет и новых пулов не открывает, каждый дочерний процесс создает собственный.
+    """
+    for alias in used_aliases():
+        connection = connections[alias]
+        if connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            connection.close_pool()
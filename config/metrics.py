@@ -0,0 +1,274 @@
+import contextvars
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from config.db import get_pool_stats
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+COUNTERS = {
+    'http_requests_total': 'Количество HTTP-запросов.',
+}
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Время обработки HTTP-запроса, секунды.', LATENCY_BUCKETS),
+    'http_request_db_queries': ('Количество запросов к БД за HTTP-запрос.', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('Суммарное время запросов к БД за HTTP-запрос, секунды.', LATENCY_BUCKETS),
+    'http_request_serializer_duration_seconds': (
+        'Время рендеринга ответа (JSON, MessagePack) за HTTP-запрос, секунды.', LATENCY_BUCKETS,
+    ),
+    'http_response_size_bytes': ('Размер тела ответа, байты (без потоковых ответов).', SIZE_BUCKETS),
+}
+
+# Показатели текущего запроса. Переменная контекста доходит и до потоков sync_to_async,
+# поэтому запросы к БД асинхронных представлений тоже учитываются.
+_state = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.render_started = None
+
+
+class Registry:
+    """
+    Счетчики и гистограммы процесса с метками.
+
+    Значения хранятся как {(имя, метки): значение} и {(имя, метки): [счетчики корзин..., count, sum]}.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flushed_at = 0.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        with self._lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, list(labels), list(series)] for (name, labels), series in self.histograms.items()
+                ],
+            }
+
+    def flush(self, force=False):
+        """
+        Сохраняет снимок процесса в METRICS_DIR, чтобы /metrics любого процесса видел все.
+        Без force — не чаще раза в METRICS_FLUSH_INTERVAL секунд.
+        """
+        if not settings.METRICS_DIR:
+            return
+        now = time.monotonic()
+        if not force and now - self._flushed_at < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._flushed_at = now
+        path = Path(settings.METRICS_DIR) / f'{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, path)
+
+
+registry = Registry()
+
+
+def collect():
+    """
+    Возвращает снимки всех процессов из METRICS_DIR или только текущего процесса.
+    """
+    if not settings.METRICS_DIR:
+        return [registry.snapshot()]
+    registry.flush(force=True)
+    snapshots = []
+    for path in Path(settings.METRICS_DIR).glob('*.json'):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Файл процесса мог быть удален между glob и чтением
+            continue
+    return snapshots
+
+
+def merge(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, series in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(series))
+            for index, value in enumerate(series):
+                total[index] += value
+    return counters, histograms
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    """
+    Формирует ответ /metrics в текстовом формате Prometheus 0.0.4.
+    """
+    from modules.cache import get_stats
+
+    counters, histograms = merge(collect())
+    lines = []
+
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, float('inf')), (*series[:-2], None)):
+                cumulative = series[-2] if count is None else cumulative + count
+                lines.append(f'{name}_bucket{_labels((*labels, ("le", _number(bound))))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(series[-1])}')
+            lines.append(f'{name}_count{_labels(labels)} {series[-2]}')
+
+    # Счетчики кэша ответов модулей общие для всех процессов: они хранятся в самом кэше
+    cache_stats = get_stats()
+    lines += ['# HELP modules_cache_requests_total Обращения к кэшу ответов API модулей.',
+              '# TYPE modules_cache_requests_total counter']
+    for result in ('hits', 'misses'):
+        lines.append(f'modules_cache_requests_total{_labels((("result", result),))} {cache_stats[result]}')
+
+    # Пул соединений — состояние процесса, ответившего на запрос
+    pool_lines = []
+    for alias, item in get_pool_stats().items():
+        for key, value in sorted(item.get('pool', {}).items()):
+            pool_lines.append(f'db_pool_{key}{_labels((("alias", alias),))} {_number(value)}')
+    if pool_lines:
+        lines += ['# HELP db_pool Статистика пула соединений psycopg процесса, ответившего на запрос.',
+                  '# TYPE db_pool untyped', *pool_lines]
+
+    return '\n'.join(lines) + '\n'
+
+
+def begin_request():
+    # Соединения, открытые в потоке до загрузки обработчика (например, тестовой БД),
+    # не получили обертку через сигнал connection_created
+    for connection in connections.all(initialized_only=True):
+        install_execute_wrapper(connection)
+    return _state.set(RequestMetrics())
+
+
+def end_request(token):
+    state = _state.get()
+    _state.reset(token)
+    return state
+
+
+def record(request, response, state, duration):
+    match = request.resolver_match
+    view = match.view_name if match is not None else 'unresolved'
+    view_labels = (('view', view),)
+
+    status_labels = (('method', request.method), ('status', str(response.status_code)))
+    registry.inc('http_requests_total', (*view_labels, *status_labels))
+    registry.observe('http_request_duration_seconds', view_labels, duration)
+    registry.observe('http_request_db_queries', view_labels, state.queries)
+    registry.observe('http_request_db_duration_seconds', view_labels, state.db_time)
+    registry.observe('http_request_serializer_duration_seconds', view_labels, state.serializer_time)
+    if not response.streaming:
+        registry.observe('http_response_size_bytes', view_labels, len(response.content))
+    registry.flush()
+
+    budget = settings.METRICS_QUERY_BUDGET
+    if budget and state.queries > budget:
+        logger.warning(
+            '%s %s (%s): %d queries to the database, budget %d',
+            request.method, request.path, view, state.queries, budget,
+        )
+
+
+def start_render():
+    state = _state.get()
+    if state is not None:
+        state.render_started = time.perf_counter()
+
+
+def finish_render(response):
+    state = _state.get()
+    if state is not None and state.render_started is not None:
+        state.serializer_time += time.perf_counter() - state.render_started
+        state.render_started = None
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    state = _state.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        state.queries += 1
+        state.db_time += time.perf_counter() - started
+
+
+def install_execute_wrapper(connection, **kwargs):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+connection_created.connect(install_execute_wrapper, dispatch_uid='config.metrics.install_execute_wrapper')
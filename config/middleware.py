@@ -0,0 +1,116 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from config import metrics, routers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Открывает контекст маршрутизации БД для запроса (см. config.routers.ReplicaRouter).
+
+    Реплики используются только безопасными запросами. Клиент, который только что выполнил
+    запись, получает cookie DATABASE_PRIMARY_PIN_COOKIE и следующие
+    DATABASE_REPLICA_PIN_SECONDS секунд читает с основной БД, чтобы видеть свои изменения
+    несмотря на отставание реплик.
+
+    Поддерживает и синхронный, и асинхронный режим, чтобы под ASGI не переводить
+    асинхронные представления в поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = routers.begin_request(self.use_replicas(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.end_request(token)
+        return self.process_response(response, wrote)
+
+    async def __acall__(self, request):
+        token = routers.begin_request(self.use_replicas(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = routers.end_request(token)
+        return self.process_response(response, wrote)
+
+    @staticmethod
+    def use_replicas(request):
+        return (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method in SAFE_METHODS
+            and settings.DATABASE_PRIMARY_PIN_COOKIE not in request.COOKIES
+        )
+
+    @staticmethod
+    def process_response(response, wrote):
+        if wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                settings.DATABASE_PRIMARY_PIN_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Собирает метрики запроса по имени маршрута (`modules:modules_all`, `users:user-list`, ...):
+    время обработки, количество и время запросов к БД, время сериализации и размер ответа.
+    Метрики отдаются в формате Prometheus по адресу /metrics (config.views.MetricsView).
+
+    При METRICS_QUERY_BUDGET > 0 запрос, выполнивший больше запросов к БД, пишет
+    предупреждение в лог `config.metrics`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = metrics.begin_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            state = metrics.end_request(token)
+        metrics.record(request, response, state, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        token = metrics.begin_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = metrics.end_request(token)
+        metrics.record(request, response, state, time.perf_counter() - started)
+        return response
+
+    def process_template_response(self, request, response):
+        # Ответы DRF рендерятся после этого хука. Быстрый путь чтения через values() обходит сериализаторы,
+        # поэтому время сериализации — это время рендеринга ответа, без обертывания классов DRF
+        metrics.start_render()
+        response.add_post_render_callback(metrics.finish_render)
+        return response
@@ -0,0 +1,51 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack необязателен
+    msgpack = None
+
+# Типы, которые не умеют orjson и msgpack (Decimal, ленивые строки, QuerySet и т.п.),
+# приводятся так же, как в стандартном JSONRenderer
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson; без orjson работает как стандартный JSONRenderer.
+
+    Ответ побайтово совпадает с JSONRenderer в компактном режиме. Запросы с отступами
+    (Browsable API, `Accept: application/json; indent=4`) отдаются стандартному рендереру.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        # Ошибки массовых операций приходят словарем с целочисленными ключами-индексами
+        ret = orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        # Как и JSONRenderer, экранируем U+2028/U+2029, недопустимые в JavaScript-строках
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Рендерер `application/msgpack` для внутренних сервисов; выбирается заголовком Accept.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
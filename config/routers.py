@@ -0,0 +1,131 @@
+import contextvars
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Состояние текущего запроса: разрешено ли читать с реплик, выбранная реплика и была ли запись.
+# Вне запроса (Celery, команды manage.py, миграции) чтение всегда идет с основной БД.
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.alias = None
+        self.wrote = False
+
+
+def begin_request(use_replicas):
+    """
+    Открывает контекст маршрутизации запроса; возвращает токен для end_request.
+    """
+    return _state.set(RoutingState(use_replicas))
+
+
+def end_request(token):
+    """
+    Закрывает контекст запроса и сообщает, выполнялась ли в нем запись.
+    """
+    state = _state.get()
+    _state.reset(token)
+    return state is not None and state.wrote
+
+
+class ReplicaSet:
+    """
+    Реплики из DATABASE_REPLICAS: выбор по кругу и временное исключение нездоровых.
+
+    Реплика проверяется не чаще раза в DATABASE_REPLICA_CHECK_INTERVAL секунд: соединение
+    должно открываться, а для PostgreSQL отставание репликации не должно превышать
+    DATABASE_REPLICA_MAX_LAG секунд. Не прошедшая проверку реплика исключается на
+    DATABASE_REPLICA_EJECT_SECONDS секунд.
+    """
+
+    def __init__(self):
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._ejected_until = {}
+            self._checked_at = {}
+
+    def choose(self):
+        replicas = settings.DATABASE_REPLICAS
+        for _ in range(len(replicas)):
+            alias = replicas[next(self._counter) % len(replicas)]
+            if self.is_healthy(alias):
+                return alias
+        return None
+
+    def eject(self, alias, reason):
+        logger.warning('Replica %s ejected for %ss: %s', alias, settings.DATABASE_REPLICA_EJECT_SECONDS, reason)
+        with self._lock:
+            self._ejected_until[alias] = time.monotonic() + settings.DATABASE_REPLICA_EJECT_SECONDS
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            if self._ejected_until.get(alias, 0) > now:
+                return False
+            if now - self._checked_at.get(alias, float('-inf')) < settings.DATABASE_REPLICA_CHECK_INTERVAL:
+                return True
+            self._checked_at[alias] = now
+
+        try:
+            lag = self.get_lag(connections[alias])
+        except DatabaseError as exc:
+            self.eject(alias, exc)
+            return False
+        if lag is not None and lag > settings.DATABASE_REPLICA_MAX_LAG:
+            self.eject(alias, f'replication lag {lag:.1f}s')
+            return False
+        return True
+
+    @staticmethod
+    def get_lag(connection):
+        connection.ensure_connection()
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            # NULL на основной БД и на реплике, которая еще ничего не применила
+            cursor.execute('SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())')
+            lag = cursor.fetchone()[0]
+        return float(lag) if lag is not None else None
+
+
+replicas = ReplicaSet()
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение безопасных HTTP-запросов на реплики, а запись — на основную БД.
+
+    Один запрос читает с одной реплики, чтобы все его запросы видели одно состояние данных.
+    После первой записи оставшиеся чтения запроса идут с основной БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replicas or state.wrote:
+            return 'default'
+        if state.alias is None:
+            state.alias = replicas.choose() or 'default'
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной БД
+        return True
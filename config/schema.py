@@ -0,0 +1,175 @@
+import functools
+import hashlib
+import json
+import logging
+import threading
+from importlib import import_module
+from pathlib import Path
+
+import drf_yasg
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, yaml_dump
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer, SwaggerYAMLRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+logger = logging.getLogger(__name__)
+
+schema_info = openapi.Info(
+    title="DRFHomeWork API",
+    default_version='v1',
+    description="Документация API для проекта DRFHomeWork",
+)
+
+schema_view = get_schema_view(
+    schema_info,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+# Схема в памяти процесса: {(отпечаток URLconf, формат): (тело, ETag)}
+_schemas = {}
+# Рендереры самой схемы; остальные форматы (страница Swagger UI) строятся как прежде
+SPEC_RENDERERS = (OpenAPIRenderer, SwaggerJSONRenderer, SwaggerYAMLRenderer)
+_lock = threading.Lock()
+
+
+def _describe_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _describe_patterns(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            view = getattr(pattern.callback, 'view_class', None) or getattr(pattern.callback, 'cls', None) \
+                or pattern.callback
+            yield f'{route} {pattern.name} {view.__module__}.{view.__qualname__}'
+
+
+@functools.lru_cache(maxsize=1)
+def _source_fingerprint():
+    """
+    Хэш исходного кода приложений проекта и пакета URLconf: поля схемы задают сериализаторы,
+    модели и docstring представлений, а не только маршруты. Сторонние пакеты учитываются версией drf_yasg.
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    directories = {Path(app_config.path).resolve() for app_config in apps.get_app_configs()}
+    directories.add(Path(import_module(settings.ROOT_URLCONF).__file__).resolve().parent)
+    digest = hashlib.sha256()
+    for directory in sorted(directories):
+        if not directory.is_relative_to(base_dir) or 'site-packages' in directory.parts:
+            continue
+        for path in sorted(directory.rglob('*.py')):
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=8)
+def _resolver_fingerprint(resolver):
+    lines = [
+        f'drf_yasg {drf_yasg.__version__}',
+        f'source {_source_fingerprint()}',
+        *_describe_patterns(resolver.url_patterns),
+    ]
+    return hashlib.sha256('\n'.join(lines).encode()).hexdigest()[:16]
+
+
+def urlconf_fingerprint(urlconf=None):
+    """
+    Отпечаток маршрутов, классов представлений и исходного кода приложений: схема пересчитывается,
+    только когда он меняется. Считается один раз на объект резолвера, который Django пересоздает
+    при смене URLconf.
+    """
+    return _resolver_fingerprint(get_resolver(urlconf))
+
+
+def schema_path(fingerprint):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f'openapi-{fingerprint}.json'
+
+
+def generate_schema():
+    """
+    Строит схему OpenAPI без запроса: поле host не заполняется, и Swagger UI
+    обращается к тому адресу, с которого загружена документация.
+    """
+    schema = OpenAPISchemaGenerator(schema_info).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema(fingerprint=None):
+    fingerprint = fingerprint or urlconf_fingerprint()
+    body = generate_schema()
+    path = schema_path(fingerprint)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    temporary.write_bytes(body)
+    temporary.replace(path)
+    return path, body
+
+
+def _load_schema(fingerprint):
+    try:
+        return schema_path(fingerprint).read_bytes()
+    except OSError:
+        pass
+    try:
+        return write_schema(fingerprint)[1]
+    except OSError as exc:
+        # Каталог только для чтения: схема остается в памяти процесса
+        logger.warning('OpenAPI schema was not saved: %s', exc)
+        return generate_schema()
+
+
+def get_schema(renderer_format='openapi'):
+    """
+    Возвращает пару (тело, ETag) схемы для текущего URLconf: из памяти, из файла, записанного
+    командой generate_schema при сборке образа, или, если файла нет, генерирует ее один раз на процесс.
+    """
+    fingerprint = urlconf_fingerprint()
+    key = (fingerprint, 'yaml' if renderer_format == 'yaml' else 'json')
+    cached = _schemas.get(key)
+    if cached is not None:
+        return cached
+    with _lock:
+        if key not in _schemas:
+            body = _load_schema(fingerprint)
+            if key[1] == 'yaml':
+                body = yaml_dump(json.loads(body), binary=True)
+            _schemas[key] = (body, quote_etag(hashlib.md5(body).hexdigest()))
+        return _schemas[key]
+
+
+def clear_schema_cache():
+    _schemas.clear()
+    _resolver_fingerprint.cache_clear()
+    _source_fingerprint.cache_clear()
+
+
+class CachedSchemaView(schema_view):
+    """
+    Отдает схему OpenAPI (`?format=openapi`, `.json`, `.yaml`) из кэша с ETag; страница Swagger UI
+    строится как прежде — без обхода представлений.
+    """
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, SPEC_RENDERERS):
+            return super().get(request, version, format)
+
+        body, etag = get_schema(renderer.format)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = HttpResponse(body, content_type=f'{renderer.media_type}; charset=utf-8')
+        response['ETag'] = etag
+        return response
+
+
+swagger_ui_view = CachedSchemaView.with_ui('swagger', cache_timeout=0)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 import os
+from importlib.util import find_spec
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -31,6 +32,28 @@ ALLOWED_HOSTS = []
 
 AUTH_USER_MODEL = 'users.User'
 
+# Читать количество модулей пользователя из денормализованного поля User.module_count
+# вместо агрегирующего запроса
+USERS_MODULE_COUNT_DENORMALIZED = os.getenv('USERS_MODULE_COUNT_DENORMALIZED', 'False') == 'True'
+
+# Проверка пароля с кэшированием успешных входов (см. users.backends.CachedModelBackend)
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+
+# Время жизни записи о проверенных учетных данных, секунды; 0 отключает кэширование
+USERS_AUTH_CACHE_TTL = int(os.getenv('USERS_AUTH_CACHE_TTL', 60))
+
+# На чтении строить пользователя JWT из claims токена, без запроса к users.User
+USERS_JWT_CLAIMS_USER = os.getenv('USERS_JWT_CLAIMS_USER', 'False') == 'True'
+
+# Максимальное количество ID в одном запросе /users/user/batch/
+USERS_BATCH_MAX_SIZE = int(os.getenv('USERS_BATCH_MAX_SIZE', 100))
+
+# Пакетное создание пользователей: максимум строк в запросе /users/user/bulk/, строк в одном INSERT
+# и потоков хэширования паролей (по умолчанию — по числу ядер)
+USERS_BULK_MAX_SIZE = int(os.getenv('USERS_BULK_MAX_SIZE', 1000))
+USERS_PROVISION_BATCH_SIZE = int(os.getenv('USERS_PROVISION_BATCH_SIZE', 1000))
+USERS_PROVISION_WORKERS = int(os.getenv('USERS_PROVISION_WORKERS') or os.cpu_count() or 1)
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -52,7 +75,27 @@ INSTALLED_APPS = [
     'drf_yasg',
 ]
 
+# Роль процесса: web (WSGI/ASGI), celery (воркер) или beat; для Celery задается в config/celery.py
+PROCESS_ROLE = os.getenv('PROCESS_ROLE', 'web')
+
+# Приложения, которые процесс роли не использует и поэтому не импортирует при старте.
+# Веб-процесс загружает приложение Celery при постановке первой задачи (modules.tasks);
+# таблицы django_celery_beat мигрирует роль beat: PROCESS_ROLE=beat python manage.py migrate
+ROLE_EXCLUDED_APPS = {
+    'web': {'config.celery', 'django_celery_beat'},
+    'celery': {'django.contrib.staticfiles', 'rest_framework_simplejwt', 'drf_yasg', 'django_celery_beat'},
+    'beat': {'django.contrib.staticfiles', 'rest_framework_simplejwt', 'drf_yasg'},
+}
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ROLE_EXCLUDED_APPS[PROCESS_ROLE]]
+if PROCESS_ROLE != 'web':
+    # Админка нужна ради модели LogEntry, которая ссылается на пользователей, но без импорта admin.py приложений
+    INSTALLED_APPS[INSTALLED_APPS.index('django.contrib.admin')] = 'django.contrib.admin.apps.SimpleAdminConfig'
+
 MIDDLEWARE = [
+    # Самым внешним, чтобы время запроса включало остальные middleware
+    'config.middleware.MetricsMiddleware',
+    # Первым, чтобы запись сессии в process_response тоже закрепляла клиента за основной БД
+    'config.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,9 +136,72 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('POSTGRES_HOST'),
         'PORT': os.getenv('POSTGRES_PORT'),
+        # Перед повторным использованием соединения проверяется, что оно живо
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Режим подключений к PostgreSQL:
+# pool — пул соединений psycopg3 на процесс, persistent — соединение потока живет CONN_MAX_AGE секунд,
+# none — новое соединение на каждый запрос
+POSTGRES_POOL_MODE = os.getenv('POSTGRES_POOL_MODE', 'persistent')
+
+# Размер пула (минимум, максимум) для каждой роли: воркеры Celery выполняют по одной задаче на процесс
+POSTGRES_POOL_SIZES = {
+    'web': (int(os.getenv('POSTGRES_POOL_MIN_SIZE', 2)), int(os.getenv('POSTGRES_POOL_MAX_SIZE', 10))),
+    'celery': (int(os.getenv('POSTGRES_CELERY_POOL_MIN_SIZE', 1)), int(os.getenv('POSTGRES_CELERY_POOL_MAX_SIZE', 2))),
+}
+
+if POSTGRES_POOL_MODE == 'pool' and 'postgresql' in (DATABASES['default']['ENGINE'] or ''):
+    min_size, max_size = POSTGRES_POOL_SIZES['web' if PROCESS_ROLE == 'web' else 'celery']
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': min_size,
+            'max_size': max_size,
+            # Сколько секунд запрос ждет свободное соединение, прежде чем завершиться ошибкой
+            'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT', 10)),
+        },
+    }
+elif POSTGRES_POOL_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', 60))
+
+# Реплики для чтения: POSTGRES_REPLICA_HOSTS=host1:5432,host2:5432 (псевдонимы replica, replica_2, ...).
+# Имя БД и учетные данные те же, что у основной, если не заданы POSTGRES_REPLICA_USER/POSTGRES_REPLICA_PASSWORD.
+DATABASE_REPLICAS = []
+for index, address in enumerate(filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = 'replica' if index == 1 else f'replica_{index}'
+    host, _, port = address.strip().partition(':')
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'USER': os.getenv('POSTGRES_REPLICA_USER') or DATABASES['default']['USER'],
+        'PASSWORD': os.getenv('POSTGRES_REPLICA_PASSWORD') or DATABASES['default']['PASSWORD'],
+        # В тестах реплика — зеркало тестовой основной БД
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+if not DATABASE_REPLICAS:
+    # Без реплик псевдоним replica маршрутизатором и статистикой пулов (config.db.used_aliases)
+    # не используется; в тестах это отдельная тестовая БД, на которой проверяется маршрутизация чтения
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'TEST': {'NAME': f"test_{DATABASES['default']['NAME']}_replica"} if 'postgresql' in (
+            DATABASES['default']['ENGINE'] or '') else {},
+    }
+
+DATABASE_ROUTERS = ['config.routers.ReplicaRouter']
+
+# Cookie, закрепляющая клиента за основной БД после записи, и время закрепления, секунды
+DATABASE_PRIMARY_PIN_COOKIE = 'db_primary'
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', 5))
+
+# Проверка реплик: интервал, допустимое отставание и время исключения нездоровой реплики, секунды
+DATABASE_REPLICA_CHECK_INTERVAL = float(os.getenv('DATABASE_REPLICA_CHECK_INTERVAL', 5))
+DATABASE_REPLICA_MAX_LAG = float(os.getenv('DATABASE_REPLICA_MAX_LAG', 10))
+DATABASE_REPLICA_EJECT_SECONDS = float(os.getenv('DATABASE_REPLICA_EJECT_SECONDS', 30))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -131,6 +237,17 @@ USE_TZ = True
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATIC_URL = 'static/'
 
+# Каталог заранее сгенерированной схемы OpenAPI (python manage.py generate_schema)
+OPENAPI_SCHEMA_DIR = os.getenv('OPENAPI_SCHEMA_DIR', os.path.join(BASE_DIR, 'openapi'))
+
+# Списки админки без фильтров берут количество строк из статистики PostgreSQL, если в таблице
+# не меньше стольких строк; точное количество — параметр ?exact_count=1 (config.admin)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000))
+
+# Загруженные файлы (в том числе файлы импорта модулей, которые читает воркер Celery)
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+MEDIA_URL = 'media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -140,17 +257,110 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny'
-    ]
+    ],
+    # JSON через orjson (без него — стандартный json); MessagePack — только при установленном msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.ORJSONRenderer',
+        *(['config.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.parsers.ORJSONParser',
+        *(['config.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
 
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.UserTokenObtainPairSerializer',
 }
 
+# Cache
+# Redis используется, если он настроен; иначе (локально и в тестах) — кэш в памяти процесса
+
+if os.getenv('REDIS_HOST'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': (
+                f"redis://:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}"
+                f"/{os.getenv('REDIS_CACHE_DB', '1')}"
+            ),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Время жизни закэшированных ответов API модулей, секунды
+MODULES_CACHE_TTL = int(os.getenv('MODULES_CACHE_TTL', 300))
+
+# Максимальное количество элементов в одном запросе /modules/bulk/
+MODULES_BULK_MAX_SIZE = int(os.getenv('MODULES_BULK_MAX_SIZE', 1000))
+
+# Максимальное количество ID в порядке модулей для /modules/reorder/
+MODULES_REORDER_MAX_SIZE = int(os.getenv('MODULES_REORDER_MAX_SIZE', 10000))
+
+# Максимальное количество ID в одном запросе /modules/batch/
+MODULES_BATCH_MAX_SIZE = int(os.getenv('MODULES_BATCH_MAX_SIZE', 100))
+
+# Синхронизация /modules/changes/: максимум изменений в одном ответе и время хранения tombstone-записей
+# удаленных модулей, секунды. Токен старше MODULES_SYNC_TOMBSTONE_TTL отклоняется (410 Gone).
+# Задача compact_module_tombstones очищает старые записи раз в MODULES_SYNC_COMPACT_INTERVAL секунд.
+MODULES_SYNC_PAGE_SIZE = int(os.getenv('MODULES_SYNC_PAGE_SIZE', 500))
+MODULES_SYNC_TOMBSTONE_TTL = int(os.getenv('MODULES_SYNC_TOMBSTONE_TTL', 30 * 24 * 60 * 60))
+MODULES_SYNC_COMPACT_INTERVAL = int(os.getenv('MODULES_SYNC_COMPACT_INTERVAL', 60 * 60))
+MODULES_SYNC_COMPACT_BATCH_SIZE = int(os.getenv('MODULES_SYNC_COMPACT_BATCH_SIZE', 5000))
+
+# Количество строк, читаемых из серверного курсора за раз при выгрузке /modules/export/
+MODULES_EXPORT_CHUNK_SIZE = int(os.getenv('MODULES_EXPORT_CHUNK_SIZE', 2000))
+
+# Размер пачки строк при импорте модулей и максимальное количество ошибок в результате импорта
+MODULES_IMPORT_BATCH_SIZE = int(os.getenv('MODULES_IMPORT_BATCH_SIZE', 5000))
+MODULES_IMPORT_MAX_ERRORS = int(os.getenv('MODULES_IMPORT_MAX_ERRORS', 100))
+
+# Асинхронные представления modules.async_views: максимум одновременно обрабатываемых запросов
+# на процесс и время ожидания очереди до ответа 503, секунды
+MODULES_ASYNC_MAX_CONCURRENCY = int(os.getenv('MODULES_ASYNC_MAX_CONCURRENCY', 100))
+MODULES_ASYNC_QUEUE_TIMEOUT = float(os.getenv('MODULES_ASYNC_QUEUE_TIMEOUT', 5))
+
+# Метрики запросов в формате Prometheus (config.metrics, /metrics).
+# METRICS_TOKEN — токен для заголовка `Authorization: Bearer <токен>`; без него метрики видят только администраторы.
+# METRICS_DIR — общий каталог процессов веб-сервера: каждый процесс раз в METRICS_FLUSH_INTERVAL секунд
+# сохраняет туда свои метрики, а /metrics суммирует все файлы. Без каталога /metrics отдает метрики одного процесса.
+# METRICS_QUERY_BUDGET — больше запросов к БД за HTTP-запрос приводит к предупреждению в логе (0 — выключено).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+METRICS_QUERY_BUDGET = int(os.getenv('METRICS_QUERY_BUDGET', 0))
+
 # Celery settings
-CELERY_BROKER_URL = f"redis://:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}/{os.getenv('REDIS_DB')}"
-CELERY_RESULT_BACKEND = 'CELERY_RESULT_BACKEND'
+# Без Redis (локально и в тестах) брокер и хранилище результатов работают в памяти процесса
+if os.getenv('REDIS_HOST'):
+    CELERY_BROKER_URL = f"redis://:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}/{os.getenv('REDIS_DB')}"
+    CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND') or CELERY_BROKER_URL
+else:
+    CELERY_BROKER_URL = 'memory://'
+    CELERY_RESULT_BACKEND = 'cache+memory://'
+CELERY_TASK_TRACK_STARTED = True
+CELERY_RESULT_EXTENDED = True
+CELERY_RESULT_EXPIRES = 24 * 60 * 60
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+# Периодические задачи процесса beat
+CELERY_BEAT_SCHEDULE = {
+    'compact-module-tombstones': {
+        'task': 'modules.tasks.compact_module_tombstones',
+        'schedule': MODULES_SYNC_COMPACT_INTERVAL,
+    },
+}
@@ -16,22 +16,24 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.routers import DefaultRouter
+from config.views import DatabasePoolStatsAPIView, MetricsView
 from users.views import UserViewSet
 
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="DRFHomeWork API",
-        default_version='v1',
-        description="Документация API для проекта DRFHomeWork",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+def lazy_view(dotted_path):
+    """
+    Представление, модуль которого импортируется при первом запросе, а не при загрузке URLconf.
+    """
+
+    @csrf_exempt
+    def view(request, *args, **kwargs):
+        return import_string(dotted_path)(request, *args, **kwargs)
+
+    return view
+
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
@@ -41,7 +43,12 @@ urlpatterns = [
     path('', include(('modules.urls', 'modules'), namespace='modules')),
     path('users/', include(('users.urls', 'users'), namespace='users')),
     path('api/', include(('users.urls', 'users'), namespace='users')),
+    # Состояние подключений к БД текущего процесса (для подбора размера пула)
+    path('db/pool/', DatabasePoolStatsAPIView.as_view(), name='db_pool_stats'),
+    # Метрики запросов в формате Prometheus
+    path('metrics', MetricsView.as_view(), name='metrics'),
 
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    # path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # Схема строится один раз на версию URLconf и отдается из кэша; drf_yasg импортируется
+    # при первом обращении к документации (см. config.schema)
+    path('swagger/', lazy_view('config.schema.swagger_ui_view'), name='schema-swagger-ui'),
 ]
@@ -0,0 +1,64 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.authentication import get_authorization_header
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config import metrics
+from config.db import get_pool_stats
+
+
+class DatabasePoolStatsAPIView(APIView):
+    """
+    Представление для просмотра состояния подключений к БД процесса, обработавшего запрос.
+
+    **Доступ:**
+    - Доступно только администраторам.
+
+    **Метод:**
+    - GET
+
+    **Ответ:**
+    - `200 OK`: Роль процесса, режим подключений и статистика пула по каждому псевдониму БД.
+    - `403 Forbidden`: У пользователя нет прав на просмотр.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_pool_stats())
+
+
+class MetricsView(View):
+    """
+    Метрики запросов в текстовом формате Prometheus.
+
+    **Доступ:**
+    - По заголовку `Authorization: Bearer <METRICS_TOKEN>`, если токен задан; иначе — администраторам (сессия).
+
+    **Метод:**
+    - GET
+
+    **Ответ:**
+    - `200 OK`: Метрики всех процессов из METRICS_DIR или процесса, обработавшего запрос.
+    - `403 Forbidden`: Нет доступа.
+    """
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_access(request):
+            return HttpResponse(status=403)
+        return HttpResponse(metrics.render(), content_type=self.content_type)
+
+    @staticmethod
+    def has_access(request):
+        if settings.METRICS_TOKEN:
+            auth = get_authorization_header(request).split()
+            return (
+                len(auth) == 2 and auth[0].lower() == b'bearer'
+                and hmac.compare_digest(auth[1], settings.METRICS_TOKEN.encode())
+            )
+        return request.user.is_staff
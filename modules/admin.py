@@ -1,10 +1,80 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.utils.translation import gettext as _
 
+from config.admin import EstimatedCountAdminMixin
 from modules.models import Module
 
 
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Фильтр по внешнему ключу с выбором значения через автодополнение админки.
+    В отличие от RelatedFieldListFilter не выводит в списке все объекты связанной модели;
+    у ее ModelAdmin должны быть заданы search_fields.
+    """
+    template = 'admin/modules/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_kwarg_isnull = f'{field_path}__isnull'
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.lookup_val = self.used_parameters.get(self.lookup_kwarg, [None])[-1]
+        self.lookup_val_isnull = self.used_parameters.get(self.lookup_kwarg_isnull, [None])[-1]
+        self.empty_value_display = model_admin.get_empty_value_display()
+        # Поле формы задает виджету выборку, из которой берется подпись выбранного объекта
+        self.form_field = forms.ModelChoiceField(
+            field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site, attrs={'style': 'width: 100%'}),
+            required=False,
+        )
+        self.hidden_params = []
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg, self.lookup_kwarg_isnull]
+
+    def choices(self, changelist):
+        # Остальные параметры списка сохраняются при выборе значения в форме фильтра
+        self.hidden_params = [
+            (name, value) for name, value in changelist.params.items() if name not in self.expected_parameters()
+        ]
+        yield {
+            'selected': self.lookup_val is None and not self.lookup_val_isnull,
+            'query_string': changelist.get_query_string(remove=self.expected_parameters()),
+            'display': _('All'),
+        }
+        if self.field.null:
+            yield {
+                'selected': bool(self.lookup_val_isnull),
+                'query_string': changelist.get_query_string(
+                    {self.lookup_kwarg_isnull: 'True'}, [self.lookup_kwarg]
+                ),
+                'display': self.empty_value_display,
+            }
+
+    def rendered_widget(self):
+        # Вызывается из шаблона: некорректное значение к этому моменту уже отклонено ChangeList
+        return self.form_field.widget.render(
+            self.lookup_kwarg, self.lookup_val, attrs={'id': f'{self.lookup_kwarg}_filter'}
+        )
+
+
 @admin.register(Module)
-class ModuleAdmin(admin.ModelAdmin):
+class ModuleAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ('number', 'name', 'description', 'owner')
-    list_filter = ('owner',)
+    # Владелец загружается JOIN-ом, а не отдельным запросом на каждую строку
+    list_select_related = ('owner',)
+    list_filter = (('owner', AutocompleteFilter),)
+    # Поиск по названию использует триграммный индекс module_name_trgm_idx
     search_fields = ('name',)
+    autocomplete_fields = ('owner',)
+    # Явный id вместо добавляемого админкой -pk: сортировка идет по индексу module_number_id_idx
+    ordering = ('number', 'id')
+
+    @property
+    def media(self):
+        # Скрипты автодополнения для фильтра по владельцу в списке модулей
+        return super().media + AutocompleteSelect(Module._meta.get_field('owner'), self.admin_site).media
@@ -0,0 +1,238 @@
+import asyncio
+import base64
+import binascii
+import math
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import aauthenticate, get_user_model
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.authentication import SessionAuthentication, get_authorization_header
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from modules.models import Module
+from modules.pagination import ModulesPaginator
+from modules.serializers import ModuleSerializer, ModuleBulkSerializer, ValuesSerializer
+from users.authentication import ClaimsJWTAuthentication
+
+# Семафор на каждый цикл событий: у каждого процесса ASGI-сервера свой лимит
+_limiters = weakref.WeakKeyDictionary()
+
+
+def get_limiter():
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = _limiters[loop] = asyncio.Semaphore(settings.MODULES_ASYNC_MAX_CONCURRENCY)
+    return limiter
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """
+    Базовое асинхронное представление API без перехода в поток на каждый запрос.
+
+    Разбор тела, согласование формата и рендеринг выполняются классами DRF из
+    REST_FRAMEWORK, аутентификация — асинхронно в том же порядке, что и у синхронных
+    представлений: сессия, Basic, JWT.
+
+    Одновременно обрабатывается не больше MODULES_ASYNC_MAX_CONCURRENCY запросов на процесс:
+    каждый запрос к ORM занимает поток и соединение с БД. Запрос, не дождавшийся очереди за
+    MODULES_ASYNC_QUEUE_TIMEOUT секунд, получает `503 Service Unavailable`.
+    """
+    authentication_required = True
+    http_method_names = ['get', 'post', 'head']
+
+    async def dispatch(self, request, *args, **kwargs):
+        limiter = get_limiter()
+        try:
+            await asyncio.wait_for(limiter.acquire(), settings.MODULES_ASYNC_QUEUE_TIMEOUT)
+        except TimeoutError:
+            response = HttpResponse(status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = '1'
+            return response
+
+        try:
+            self.drf_request = Request(
+                request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES], authenticators=(),
+            )
+            try:
+                self.user = await self.authenticate(request)
+                if self.authentication_required and self.user is None:
+                    raise exceptions.NotAuthenticated()
+                method = request.method.lower()
+                handler = getattr(self, method, None) if method in self.http_method_names else None
+                if handler is None:
+                    raise exceptions.MethodNotAllowed(request.method)
+                data, code = await handler(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+                data, code = detail, exc.status_code
+                if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                    # Как и в синхронных представлениях: первый аутентификатор — сессия, заголовка
+                    # WWW-Authenticate нет, поэтому 403
+                    code = status.HTTP_403_FORBIDDEN
+            return self.render(data, code)
+        finally:
+            limiter.release()
+
+    async def authenticate(self, request):
+        user = await request.auser()
+        if user.is_authenticated:
+            if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+                SessionAuthentication().enforce_csrf(self.drf_request)
+            return user
+
+        auth = get_authorization_header(request).split()
+        if auth and auth[0].lower() == b'basic':
+            return await self.authenticate_basic(request, auth)
+
+        result = await ClaimsJWTAuthentication().aauthenticate(request)
+        return result[0] if result is not None else None
+
+    @staticmethod
+    async def authenticate_basic(request, auth):
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid basic header.')
+        try:
+            userid, _, password = base64.b64decode(auth[1]).decode().partition(':')
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise exceptions.AuthenticationFailed('Invalid basic header. Credentials not correctly base64 encoded.')
+
+        credentials = {get_user_model().USERNAME_FIELD: userid, 'password': password}
+        user = await aauthenticate(request=request, **credentials)
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed('Invalid username/password.')
+        return user
+
+    def render(self, data, code):
+        renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+        renderers = [renderer for renderer in renderers if renderer.format != 'api'] or renderers
+        try:
+            renderer, media_type = DefaultContentNegotiation().select_renderer(self.drf_request, renderers)
+        except exceptions.NotAcceptable as exc:
+            renderer, media_type = renderers[0], renderers[0].media_type
+            data, code = {'detail': exc.detail}, exc.status_code
+
+        content_type = f'{media_type}; charset={renderer.charset}' if renderer.charset else media_type
+        return HttpResponse(renderer.render(data, media_type, {}), status=code, content_type=content_type)
+
+
+class AsyncModulesListView(AsyncAPIView):
+    """
+    Асинхронная версия представления для получения списка модулей.
+
+    **Доступ:**
+    - Доступно всем пользователям.
+
+    **Метод:**
+    - GET
+
+    **Параметры запроса:**
+    - `page`, `page_size` (int, optional): Постраничная навигация, как у `GET /modules/`.
+
+    **Ответ:**
+    - `200 OK`: Список модулей (без кэша ответов и ETag синхронного представления).
+    - `404 Not Found`: Страница не существует.
+    """
+    authentication_required = False
+    paginator_class = ModulesPaginator
+    values_serializer = ValuesSerializer(ModuleSerializer)
+
+    async def get(self, request):
+        paginator = self.paginator_class()
+        page_size = paginator.get_page_size(self.drf_request)
+        queryset = self.values_serializer.values(Module.objects.order_by('number', 'id'))
+
+        count = await queryset.acount()
+        page_number = request.GET.get(paginator.page_query_param, 1)
+        page = int(page_number) if str(page_number).isdigit() else 0
+        if not 1 <= page <= max(1, math.ceil(count / page_size)):
+            raise exceptions.NotFound(paginator.invalid_page_message.format(page_number=page_number, message=''))
+
+        offset = (page - 1) * page_size
+        results = [
+            self.values_serializer.to_representation(row)
+            async for row in queryset[offset:offset + page_size]
+        ]
+        return {
+            'count': count,
+            'next': self.page_link(request, paginator, page + 1) if offset + page_size < count else None,
+            'previous': self.page_link(request, paginator, page - 1) if page > 1 else None,
+            'results': results,
+        }, status.HTTP_200_OK
+
+    @staticmethod
+    def page_link(request, paginator, page):
+        url = request.build_absolute_uri()
+        if page == 1:
+            return remove_query_param(url, paginator.page_query_param)
+        return replace_query_param(url, paginator.page_query_param, page)
+
+
+class AsyncModulesRetrieveView(AsyncAPIView):
+    """
+    Асинхронная версия представления для получения одного модуля по ID.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям.
+
+    **Метод:**
+    - GET
+
+    **Параметры пути:**
+    - `pk` (int): ID модуля.
+
+    **Ответ:**
+    - `200 OK`: Информация о модуле.
+    - `404 Not Found`: Модуль не найден.
+    """
+    values_serializer = ValuesSerializer(ModuleSerializer)
+
+    async def get(self, request, pk):
+        row = await self.values_serializer.values(Module.objects.filter(pk=pk)).afirst()
+        if row is None:
+            raise exceptions.NotFound()
+        return self.values_serializer.to_representation(row), status.HTTP_200_OK
+
+
+class AsyncModulesCreateView(AsyncAPIView):
+    """
+    Асинхронная версия представления для создания нового модуля.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям.
+
+    **Метод:**
+    - POST
+
+    **Данные запроса:**
+    - `number` (int): Порядковый номер модуля.
+    - `name` (str): Название модуля.
+    - `description` (str, optional): Описание модуля.
+
+    **Ответ:**
+    - `201 Created`: Модуль успешно создан.
+    - `400 Bad Request`: Неверные данные в запросе.
+    """
+
+    async def post(self, request):
+        # Владелец задается автором запроса, поэтому валидация не обращается к БД
+        serializer = ModuleBulkSerializer(data=self.drf_request.data)
+        if not serializer.is_valid():
+            return serializer.errors, status.HTTP_400_BAD_REQUEST
+
+        # Асинхронных транзакций в Django нет: вставка и обновление счетчика владельца
+        # сигналом выполняются в одной транзакции за один переход в поток
+        create = sync_to_async(transaction.atomic(Module.objects.create))
+        module = await create(owner_id=self.user.pk, **serializer.validated_data)
+        return ModuleSerializer(module).data, status.HTTP_201_CREATED
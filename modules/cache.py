@@ -0,0 +1,96 @@
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY = 'modules:version'
+# Версия ответов /modules/mine/ владельца: меняется только при изменении его модулей
+OWNER_VERSION_KEY = 'modules:version:owner:{}'
+# Владелец поставленного в очередь импорта: до старта задачи ее аргументов нет в хранилище результатов
+IMPORT_OWNER_KEY = 'modules:import:owner:{}'
+STATS_KEYS = {True: 'modules:cache:hits', False: 'modules:cache:misses'}
+
+
+def get_version(key=VERSION_KEY):
+    """
+    Возвращает текущую версию кэша модулей (или версию владельца по ключу из owner_version_key).
+    """
+    version = cache.get(key)
+    if version is None:
+        # Начальная версия берется от времени, чтобы после вытеснения ключа версии
+        # не переиспользовать номера, под которыми уже лежат старые страницы
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def owner_version_key(owner_id):
+    return OWNER_VERSION_KEY.format(owner_id)
+
+
+def bump_version(owner_ids=()):
+    """
+    Делает недействительными все закэшированные ответы API модулей,
+    а ответы /modules/mine/ — только у владельцев из owner_ids.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+    # Удаленная версия владельца создается заново от текущего времени и не совпадет с прежней
+    cache.delete_many([owner_version_key(owner_id) for owner_id in set(owner_ids) if owner_id is not None])
+
+
+def bump_version_on_commit(*owner_ids):
+    # Версия меняется после фиксации транзакции, иначе параллельный запрос успеет
+    # закэшировать еще не измененные данные под новой версией
+    transaction.on_commit(partial(bump_version, owner_ids))
+
+
+def make_key(kind, request, version=None, **parts):
+    params = sorted(request.query_params.lists())
+    raw = repr((request.get_host(), params, sorted(parts.items())))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'modules:{kind}:v{get_version() if version is None else version}:{digest}'
+
+
+def record(hit):
+    key = STATS_KEYS[hit]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_stats():
+    """
+    Счетчики попаданий и промахов кэша модулей.
+    """
+    values = cache.get_many(STATS_KEYS.values())
+    return {'hits': values.get(STATS_KEYS[True], 0), 'misses': values.get(STATS_KEYS[False], 0)}
+
+
+class CachedResponseMixin:
+    """
+    Кэширует успешные ответы представлений модулей по версионированным ключам.
+    """
+    cache_kind = None
+
+    def get_cache_version(self):
+        return get_version()
+
+    def cached_response(self, request, build_response, **key_parts):
+        key = make_key(self.cache_kind, request, version=self.get_cache_version(), **key_parts)
+        data = cache.get(key)
+        record(data is not None)
+        if data is not None:
+            return Response(data)
+
+        response = build_response()
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.MODULES_CACHE_TTL)
+        return response
@@ -0,0 +1,38 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(request, *parts):
+    """
+    Строит сильный ETag из состояния данных в БД и параметров запроса.
+
+    В хэш входит согласованный тип ответа, чтобы JSON и HTML-представления
+    одного ресурса не получили одинаковый ETag.
+    """
+    raw = repr((request.accepted_media_type, sorted(request.query_params.lists()), parts))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает `304 Not Modified` на `If-None-Match`/`If-Modified-Since` до сериализации.
+    """
+
+    def conditional_response(self, request, build_response, etag, last_modified=None):
+        if etag is None:
+            return build_response()
+
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        response = build_response()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
@@ -0,0 +1,78 @@
+import csv
+import json
+import zlib
+
+# Поля в том же порядке и с теми же именами, что и в ответах ModuleSerializer: ModelSerializer выводит
+# внешние ключи (owner) после обычных полей модели, поэтому updated_at идет перед owner
+EXPORT_FIELDS = ('id', 'number', 'name', 'description', 'updated_at', 'owner')
+
+# Порог накопления строк перед отправкой очередного фрагмента ответа, байты
+FLUSH_SIZE = 64 * 1024
+
+
+def format_datetime(value):
+    # Тот же формат, что у DateTimeField в DRF: ISO 8601 с 'Z' для UTC
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def iter_rows(queryset, chunk_size):
+    """
+    Читает модули кортежами через серверный курсор, не создавая экземпляры модели.
+    """
+    updated_at = EXPORT_FIELDS.index('updated_at')
+    for row in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        row = list(row)
+        row[updated_at] = format_datetime(row[updated_at])
+        yield row
+
+
+def encode_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает записанную строку вместо буферизации."""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_chunks(lines, compress=False):
+    """
+    Склеивает строки во фрагменты ~FLUSH_SIZE байт и при необходимости сжимает их gzip.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= FLUSH_SIZE:
+            chunk = b''.join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+
+    chunk = b''.join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+FORMATS = {
+    'ndjson': (encode_ndjson, 'application/x-ndjson; charset=utf-8', 'ndjson'),
+    'csv': (encode_csv, 'text/csv; charset=utf-8', 'csv'),
+}
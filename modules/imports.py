@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+
+from django.db import connection
+from django.utils import timezone
+
+from modules.models import Module
+
+# Колонки, которые заполняет импорт; id и порядок полей задает база данных
+COPY_COLUMNS = ('number', 'name', 'description', 'owner', 'updated_at')
+
+
+def iter_import_rows(raw, file_format):
+    """
+    Построчно читает загруженный файл и возвращает пары (номер строки, данные).
+
+    Для CSV ожидается заголовок `number,name,description`, для NDJSON — по одному
+    JSON-объекту на строку.
+    """
+    text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    try:
+        if file_format == 'csv':
+            # Строка 1 — заголовок
+            yield from enumerate(csv.DictReader(text), start=2)
+            return
+
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError:
+                yield line_number, None
+    finally:
+        # Отсоединяем обертку, чтобы она не закрыла файл, которым владеет вызывающий код
+        text.detach()
+
+
+def _copy_value(value):
+    # Текстовый формат COPY: \N — NULL, служебные символы экранируются
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy_modules(modules):
+    table = Module._meta.db_table
+    columns = ', '.join(Module._meta.get_field(name).column for name in COPY_COLUMNS)
+    buffer = io.StringIO()
+    for module in modules:
+        buffer.write('\t'.join(_copy_value(getattr(module, Module._meta.get_field(name).attname))
+                               for name in COPY_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    sql = f'COPY {table} ({columns}) FROM STDIN'
+    with connection.cursor() as cursor:
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        if is_psycopg3:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.read())
+        else:
+            cursor.copy_expert(sql, buffer)
+
+
+def insert_modules(rows, owner_id):
+    """
+    Вставляет провалидированные строки: через COPY в PostgreSQL, иначе одним bulk_create.
+    """
+    now = timezone.now()
+    return bulk_insert_modules([Module(owner_id=owner_id, updated_at=now, **attrs) for attrs in rows])
+
+
+def bulk_insert_modules(modules):
+    """
+    Вставляет экземпляры Module без сигналов: через COPY в PostgreSQL, иначе одним bulk_create.
+    Поле updated_at должно быть заполнено заранее.
+    """
+    if not modules:
+        return 0
+    if connection.vendor == 'postgresql':
+        _copy_modules(modules)
+    else:
+        Module.objects.bulk_create(modules)
+    return len(modules)
@@ -0,0 +1,350 @@
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from modules.imports import bulk_insert_modules
+from modules.management.commands.seed_data import SEED_EMAIL_DOMAIN, WORDS, seed_users_queryset
+from modules.models import Module
+from users.models import User
+
+# Пространства имен маршрутов, эндпоинты которых должен покрывать набор сценариев
+NAMESPACES = ('modules', 'users')
+
+
+class Scenarios:
+    """
+    Сценарии запросов по именам маршрутов. Метод сценария возвращает (метод, путь, параметры запроса).
+
+    Изменяющие сценарии работают с модулями пользователя бенчмарка, которые создаются заранее,
+    чтобы удаление и перенумерация не затрагивали синтетические данные.
+    """
+
+    def __init__(self, rng, user, own_ids, module_ids, seed_user_ids, requests):
+        self.rng = rng
+        self.user = user
+        self.own_ids = own_ids
+        self.module_ids = module_ids
+        self.seed_user_ids = seed_user_ids
+        self.deletable = iter(own_ids[requests:])
+        self.refresh = str(RefreshToken.for_user(user))
+        self.import_task_id = None
+        self.counter = 0
+
+    def __iter__(self):
+        # Порядок важен: статус импорта опрашивается после импорта, удаление идет последним
+        return iter((
+            ('modules:modules_all', 'GET', self.modules_all),
+            ('modules:modules_all?pagination=cursor', 'GET', self.modules_all_cursor),
+            ('modules:modules_mine', 'GET', self.modules_mine),
+            ('modules:module_details', 'GET', self.module_details),
+            ('modules:modules_batch', 'GET', self.modules_batch),
+            ('modules:modules_changes', 'GET', self.modules_changes),
+            ('modules:module_new', 'POST', self.module_new),
+            ('modules:module_edit', 'PUT', self.module_edit),
+            ('modules:modules_bulk', 'POST', self.modules_bulk),
+            ('modules:modules_reorder', 'POST', self.modules_reorder),
+            ('modules:modules_search', 'GET', self.modules_search),
+            ('modules:modules_export', 'GET', self.modules_export),
+            ('modules:modules_import', 'POST', self.modules_import),
+            ('modules:modules_import_status', 'GET', self.modules_import_status),
+            ('modules:async_modules_all', 'GET', self.async_modules_all),
+            ('modules:async_module_details', 'GET', self.async_module_details),
+            ('modules:async_module_new', 'POST', self.async_module_new),
+            ('users:token_obtain_pair', 'POST', self.token_obtain_pair),
+            ('users:token_refresh', 'POST', self.token_refresh),
+            ('users:api-root', 'GET', self.api_root),
+            ('users:user-list', 'GET', self.user_list),
+            ('users:user-list', 'POST', self.user_create),
+            ('users:user-bulk', 'POST', self.user_bulk),
+            ('users:user-detail', 'GET', self.user_detail),
+            ('users:user-batch', 'GET', self.user_batch),
+            ('modules:module_remove', 'DELETE', self.module_remove),
+        ))
+
+    def next_number(self):
+        self.counter += 1
+        return self.counter
+
+    def random_page(self, count, page_size=20):
+        return {'page': self.rng.randint(1, max(1, min(count // page_size, 1000)))}
+
+    def modules_all(self):
+        return '/modules/', {'data': self.random_page(len(self.module_ids))}
+
+    def modules_all_cursor(self):
+        return '/modules/', {'data': {'pagination': 'cursor'}}
+
+    def modules_mine(self):
+        return '/modules/mine/', {'data': self.random_page(len(self.own_ids))}
+
+    def module_details(self):
+        return f'/modules/{self.rng.choice(self.module_ids)}/', {}
+
+    def modules_batch(self):
+        ids = self.rng.sample(self.module_ids, min(20, len(self.module_ids)))
+        return '/modules/batch/', {'data': {'ids': ','.join(map(str, ids))}}
+
+    def modules_changes(self):
+        # Первая страница полной синхронизации: тот же порядок (version, id), что и при догоняющей
+        return '/modules/changes/', {'data': {'page_size': 100}}
+
+    def module_new(self):
+        return '/modules/create/', {'data': {'number': self.next_number(), 'name': 'Benchmark'},
+                                    'content_type': 'application/json'}
+
+    def module_edit(self):
+        pk = self.rng.choice(self.own_ids[:len(self.own_ids) // 2])
+        return f'/modules/update/{pk}/', {'data': {'number': self.rng.randint(1, 1000), 'name': 'Benchmark edited'},
+                                          'content_type': 'application/json'}
+
+    def modules_bulk(self):
+        data = [{'number': self.next_number(), 'name': f'Benchmark bulk {i}'} for i in range(100)]
+        return '/modules/bulk/', {'data': data, 'content_type': 'application/json'}
+
+    def modules_reorder(self):
+        pk = self.rng.choice(self.own_ids[:len(self.own_ids) // 2])
+        return '/modules/reorder/', {'data': {'id': pk, 'position': self.rng.randint(1, len(self.own_ids))},
+                                     'content_type': 'application/json'}
+
+    def modules_search(self):
+        return '/modules/search/', {'data': {'q': self.rng.choice(WORDS)}}
+
+    def modules_export(self):
+        return '/modules/export/', {'data': {'owner': self.rng.choice(self.seed_user_ids)}}
+
+    def modules_import(self):
+        content = 'number,name,description\n' + ''.join(f'{i},Imported {i},\n' for i in range(10))
+        upload = io.BytesIO(content.encode())
+        upload.name = 'modules.csv'
+        return '/modules/import/', {'data': {'file': upload}}
+
+    def modules_import_status(self):
+        return f'/modules/import/{self.import_task_id}/', {}
+
+    def async_modules_all(self):
+        return '/async/modules/', {'data': self.random_page(len(self.module_ids))}
+
+    def async_module_details(self):
+        return f'/async/modules/{self.rng.choice(self.module_ids)}/', {}
+
+    def async_module_new(self):
+        return '/async/modules/create/', {'data': {'number': self.next_number(), 'name': 'Benchmark async'},
+                                          'content_type': 'application/json'}
+
+    def token_obtain_pair(self):
+        return '/users/token/', {'data': {'email': self.user.email, 'password': 'password'},
+                                 'content_type': 'application/json'}
+
+    def token_refresh(self):
+        return '/users/token/refresh/', {'data': {'refresh': self.refresh}, 'content_type': 'application/json'}
+
+    def api_root(self):
+        return '/users/', {}
+
+    def user_list(self):
+        return '/users/user/', {}
+
+    def user_create(self):
+        email = f'benchmark-created-{self.next_number()}@{SEED_EMAIL_DOMAIN}'
+        data = {'email': email, 'password': 'password', 'first_name': 'Benchmark', 'last_name': 'User'}
+        return '/users/user/', {'data': data, 'content_type': 'application/json'}
+
+    def user_bulk(self):
+        data = [
+            {'email': f'benchmark-bulk-{self.next_number()}@{SEED_EMAIL_DOMAIN}', 'password': 'password',
+             'first_name': 'Benchmark', 'last_name': 'User'}
+            for _ in range(10)
+        ]
+        return '/users/user/bulk/', {'data': data, 'content_type': 'application/json'}
+
+    def user_detail(self):
+        return f'/users/user/{self.rng.choice(self.seed_user_ids)}/', {}
+
+    def user_batch(self):
+        ids = self.rng.sample(self.seed_user_ids, min(20, len(self.seed_user_ids)))
+        return '/users/user/batch/', {'data': {'ids': ','.join(map(str, ids))}}
+
+    def module_remove(self):
+        return f'/modules/delete/{next(self.deletable)}/', {}
+
+
+def route_names():
+    """
+    Имена всех маршрутов пространств имен NAMESPACES (с учетом вложенных роутеров).
+    """
+    names = set()
+
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, pattern.namespace or namespace)
+            elif isinstance(pattern, URLPattern) and pattern.name and namespace in NAMESPACES:
+                names.add(f'{namespace}:{pattern.name}')
+
+    walk(get_resolver().url_patterns, None)
+    return names
+
+
+class Command(BaseCommand):
+    help = ('Замеряет пропускную способность и задержки p50/p95/p99 эндпоинтов modules и users на синтетических '
+            'данных разного объема. Запускать на отдельной БД: команда создает и удаляет данные.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                            help='Количество модулей в наборах данных.')
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на каждый эндпоинт.')
+        parser.add_argument('--seed', type=int, default=0, help='Зерно генератора данных и запросов.')
+        parser.add_argument('--cold', action='store_true', help='Очищать кэш перед каждым запросом.')
+        parser.add_argument('--endpoints', nargs='+', help='Замерять только эти эндпоинты.')
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+        parser.add_argument('--compare', help='JSON-результаты предыдущего запуска для сравнения.')
+        parser.add_argument('--force', action='store_true',
+                            help='Разрешить запуск на БД, в которой есть не синтетические модули.')
+
+    def handle(self, *args, **options):
+        if not options['force'] and Module.objects.exclude(owner_id__in=seed_users_queryset().values('pk')).exists():
+            raise CommandError('В БД есть модули, созданные не seed_data. Используйте отдельную БД или --force.')
+        baseline = self.load(options['compare']) if options['compare'] else {}
+
+        results = []
+        media_root = tempfile.mkdtemp(prefix='benchmark-media-')
+        try:
+            # Тестовый клиент обращается к хосту testserver; DEBUG сохраняет каждый SQL-запрос в памяти
+            with override_settings(ALLOWED_HOSTS=['testserver'], DEBUG=False, MEDIA_ROOT=media_root):
+                for size in options['sizes']:
+                    results += self.run_size(size, options)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {'meta': self.meta(options), 'results': results}
+        self.print_results(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты сохранены в {options["output"]}')
+
+    def run_size(self, size, options):
+        users = max(10, size // 100)
+        self.stdout.write(f'Набор данных: {size} модулей, {users} пользователей')
+        call_command('seed_data', users=users, modules=size, seed=options['seed'], stdout=io.StringIO())
+
+        rng = random.Random(options['seed'])
+        user = User.objects.create(email=f'benchmark@{SEED_EMAIL_DOMAIN}', is_staff=True, is_superuser=True)
+        user.set_password('password')
+        user.save()
+        # Половина модулей пользователя бенчмарка изменяется, вторая половина удаляется
+        bulk_insert_modules([
+            Module(number=i, name=f'Benchmark own {i}', owner=user, updated_at=user.date_joined)
+            for i in range(1, 2 * options['requests'] + 1)
+        ])
+        module_ids = list(Module.objects.values_list('pk', flat=True))
+        own_ids = list(Module.objects.filter(owner=user).order_by('pk').values_list('pk', flat=True))
+        seed_user_ids = list(seed_users_queryset().exclude(pk=user.pk).values_list('pk', flat=True))
+        scenarios = Scenarios(rng, user, own_ids, module_ids, seed_user_ids, options['requests'])
+
+        client = Client(headers={'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'})
+        covered = set()
+        results = []
+        for endpoint, method, scenario in scenarios:
+            route = endpoint.partition('?')[0]
+            covered.add(route)
+            if options['endpoints'] and route not in options['endpoints'] and endpoint not in options['endpoints']:
+                continue
+            result = self.measure(client, method, scenario, options)
+            last_response = result.pop('last_response')
+            if endpoint == 'modules:modules_import':
+                scenarios.import_task_id = last_response.json()['task_id']
+            results.append({'size': size, 'endpoint': endpoint, 'method': method, **result})
+            self.stdout.write(f'  {method:<6} {endpoint:<45} {result["throughput"]:>8.1f} запр/с  '
+                              f'p50 {result["p50_ms"]:.1f} мс  p99 {result["p99_ms"]:.1f} мс')
+
+        missing = route_names() - covered
+        if missing:
+            self.stdout.write(self.style.WARNING(f'  Нет сценариев для: {", ".join(sorted(missing))}'))
+        return results
+
+    @staticmethod
+    def measure(client, method, scenario, options):
+        request = getattr(client, method.lower())
+        latencies, statuses = [], Counter()
+        response = None
+        total = 0.0
+        for _ in range(options['requests']):
+            path, kwargs = scenario()
+            if options['cold']:
+                cache.clear()
+            started = time.perf_counter()
+            response = request(path, **kwargs)
+            if response.streaming:
+                # Потоковый ответ формируется при чтении тела
+                for _chunk in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+            total += elapsed
+            latencies.append(elapsed)
+            statuses[str(response.status_code)] += 1
+
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'requests': len(latencies),
+            'throughput': round(len(latencies) / total, 1),
+            'p50_ms': round(quantiles[49] * 1000, 2),
+            'p95_ms': round(quantiles[94] * 1000, 2),
+            'p99_ms': round(quantiles[98] * 1000, 2),
+            'statuses': dict(statuses),
+            'last_response': response,
+        }
+
+    @staticmethod
+    def meta(options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'vendor': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests': options['requests'],
+            'seed': options['seed'],
+            'cold_cache': options['cold'],
+        }
+
+    @staticmethod
+    def load(path):
+        with open(path) as file:
+            report = json.load(file)
+        return {(item['size'], item['endpoint'], item['method']): item for item in report['results']}
+
+    def print_results(self, results, baseline):
+        self.stdout.write('')
+        header = f'{"Строк":>8} {"Метод":<6} {"Эндпоинт":<45}{"запр/с":>9}{"p50, мс":>9}{"p95, мс":>9}{"p99, мс":>9}'
+        self.stdout.write(header + ('  Изменение p99' if baseline else ''))
+        for item in results:
+            line = (f'{item["size"]:>8} {item["method"]:<6} {item["endpoint"]:<45}{item["throughput"]:>9.1f}'
+                    f'{item["p50_ms"]:>9.1f}{item["p95_ms"]:>9.1f}{item["p99_ms"]:>9.1f}')
+            previous = baseline.get((item['size'], item['endpoint'], item['method']))
+            if previous and previous['p99_ms']:
+                line += f'  {(item["p99_ms"] / previous["p99_ms"] - 1) * 100:+.0f}%'
+            self.stdout.write(line)
@@ -0,0 +1,51 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config.parsers import ORJSONParser, MessagePackParser
+from config.renderers import ORJSONRenderer, MessagePackRenderer, msgpack
+from modules.export import format_datetime
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость рендеринга и разбора ответов: json, orjson и MessagePack (операций в секунду).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=25, help='Количество модулей в теле ответа.')
+        parser.add_argument('--repeat', type=int, default=2000, help='Количество повторов замера.')
+
+    def handle(self, *args, **options):
+        updated_at = format_datetime(timezone.now())
+        data = {
+            'count': options['rows'], 'next': None, 'previous': None,
+            'results': [
+                {'id': i, 'number': i, 'name': f'Модуль {i}', 'description': 'Описание ' * 10,
+                 'updated_at': updated_at, 'owner': 1}
+                for i in range(options['rows'])
+            ],
+        }
+
+        cases = [('json', JSONRenderer(), JSONParser()), ('orjson', ORJSONRenderer(), ORJSONParser())]
+        if msgpack is not None:
+            cases.append(('msgpack', MessagePackRenderer(), MessagePackParser()))
+        else:
+            self.stdout.write('msgpack не установлен, MessagePack пропущен')
+
+        self.stdout.write(f'{"Формат":<10}{"Размер":>10}{"Рендеринг":>18}{"Разбор":>18}')
+        for title, renderer, parser in cases:
+            body = renderer.render(data, renderer.media_type)
+            rendered = self.measure(lambda: renderer.render(data, renderer.media_type), options['repeat'])
+            parsed = self.measure(lambda: parser.parse(io.BytesIO(body), parser.media_type), options['repeat'])
+            self.stdout.write(f'{title:<10}{len(body):>8} Б{rendered:>14.0f} оп/с{parsed:>14.0f} оп/с')
+
+    @staticmethod
+    def measure(func, repeat):
+        func()  # прогрев
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return repeat / (time.perf_counter() - started)
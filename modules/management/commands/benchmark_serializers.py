@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from modules.models import Module
+from modules.serializers import ModuleSerializer, ValuesSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость ModuleSerializer и быстрого пути ValuesSerializer (строк в секунду).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Количество модулей во временном наборе данных.')
+        parser.add_argument('--page-size', type=int, default=25, help='Размер страницы для замера списка.')
+        parser.add_argument('--repeat', type=int, default=200, help='Количество повторов замера страницы.')
+
+    def handle(self, *args, **options):
+        # Данные создаются в транзакции, которая откатывается после замеров
+        with transaction.atomic():
+            owner = User.objects.create(email='benchmark-serializers@example.com')
+            Module.objects.bulk_create(
+                (Module(number=i, name=f'Module {i}', description='Описание ' * 10, owner=owner)
+                 for i in range(options['rows'])),
+                batch_size=1000,
+            )
+            values_serializer = ValuesSerializer(ModuleSerializer)
+            queryset = Module.objects.order_by('number', 'id')
+
+            def serializer_path(size):
+                return ModuleSerializer(queryset[:size], many=True).data
+
+            def values_path(size):
+                return [values_serializer.to_representation(row) for row in values_serializer.values(queryset[:size])]
+
+            cases = [
+                (f'страница {options["page_size"]} строк', options['page_size'], options['repeat']),
+                (f'выгрузка {options["rows"]} строк', options['rows'], 3),
+            ]
+            self.stdout.write(f'{"Сценарий":<24}{"ModuleSerializer":>20}{"ValuesSerializer":>20}{"Ускорение":>12}')
+            for title, size, repeat in cases:
+                before = self.measure(serializer_path, size, repeat)
+                after = self.measure(values_path, size, repeat)
+                self.stdout.write(f'{title:<24}{before:>15.0f} стр/с{after:>15.0f} стр/с{after / before:>11.1f}x')
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(func, size, repeat):
+        func(size)  # прогрев
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func(size)
+        return size * repeat / (time.perf_counter() - started)
@@ -0,0 +1,81 @@
+import asyncio
+import resource
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест HTTP-эндпоинта: заданное число одновременных соединений, '
+            'по одному запросу на соединение. Печатает пропускную способность и задержки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Адрес, например http://127.0.0.1:8000/async/modules/')
+        parser.add_argument('--concurrency', type=int, default=1000, help='Количество одновременных соединений.')
+        parser.add_argument('--requests', type=int, default=10000, help='Общее количество запросов.')
+        parser.add_argument('--header', action='append', default=[], help='Заголовок запроса "Имя: значение".')
+        parser.add_argument('--timeout', type=float, default=30, help='Таймаут одного запроса, секунды.')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Поддерживаются только адреса http://host[:port]/path.')
+
+        # Каждое соединение — файловый дескриптор: поднимаем мягкий лимит до жесткого
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < options['concurrency'] + 100:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        path = (url.path or '/') + (f'?{url.query}' if url.query else '')
+        head = [f'GET {path} HTTP/1.1', f'Host: {url.netloc}', 'Connection: close', *options['header']]
+        request = ('\r\n'.join(head) + '\r\n\r\n').encode()
+
+        started = time.perf_counter()
+        results = asyncio.run(self.run(url.hostname, url.port or 80, request, options))
+        elapsed = time.perf_counter() - started
+        self.report(results, elapsed)
+
+    async def run(self, host, port, request, options):
+        remaining = iter(range(options['requests']))
+        results = []
+
+        async def worker():
+            for _ in remaining:
+                results.append(await self.fetch(host, port, request, options['timeout']))
+
+        await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+        return results
+
+    @staticmethod
+    async def fetch(host, port, request, timeout):
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                reader, writer = await asyncio.open_connection(host, port)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status_line = await reader.readline()
+                    # Соединение закрывается сервером после ответа (Connection: close)
+                    await reader.read()
+                finally:
+                    writer.close()
+            code = status_line.split()[1].decode() if status_line else 'no response'
+        except (OSError, TimeoutError, IndexError) as exc:
+            code = type(exc).__name__
+        return code, time.perf_counter() - started
+
+    def report(self, results, elapsed):
+        latencies = sorted(latency for code, latency in results if code == '200')
+        self.stdout.write(f'Запросов: {len(results)} за {elapsed:.2f} с, {len(results) / elapsed:.0f} запр/с')
+        self.stdout.write('Ответы: ' + ', '.join(f'{code}: {count}' for code, count in Counter(
+            code for code, _ in results).most_common()))
+        if latencies:
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f'Задержка 200 OK, мс: p50 {quantiles[49] * 1000:.0f}, p95 {quantiles[94] * 1000:.0f}, '
+                f'p99 {quantiles[98] * 1000:.0f}, max {latencies[-1] * 1000:.0f}'
+            )
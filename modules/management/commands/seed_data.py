@@ -0,0 +1,112 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from modules.cache import bump_version
+from modules.imports import bulk_insert_modules
+from modules.models import Module
+from users.models import User
+
+# Домен email синтетических пользователей: по нему повторный запуск находит и удаляет прежние данные
+SEED_EMAIL_DOMAIN = 'seed.example.com'
+
+TOPICS = (
+    'Python', 'Django', 'PostgreSQL', 'Алгоритмы', 'Архитектура', 'Безопасность', 'Базы данных', 'Тестирование',
+    'Сети', 'Linux', 'Docker', 'Асинхронность', 'Кэширование', 'Очереди', 'Аналитика', 'Математика',
+)
+LEVELS = ('введение', 'основы', 'практикум', 'углубленный курс', 'проект', 'повторение')
+WORDS = (
+    'данные', 'запрос', 'индекс', 'модель', 'сервер', 'клиент', 'функция', 'класс', 'объект', 'модуль', 'задача',
+    'процесс', 'поток', 'память', 'таблица', 'транзакция', 'ошибка', 'тест', 'пример', 'упражнение', 'проверка',
+    'оптимизация', 'производительность', 'структура', 'алгоритм', 'сортировка', 'поиск', 'граф', 'дерево', 'список',
+)
+
+
+def seed_users_queryset():
+    return User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+
+
+def clear_seed_data():
+    """
+    Удаляет синтетических пользователей и их модули.
+    """
+    modules = Module.all_objects.filter(owner_id__in=seed_users_queryset().values('pk'))
+    # Вместе с tombstone-записями, пачками DELETE по ID, без сигналов для каждого модуля
+    deleted = modules.hard_delete(batch_size=10000)
+    seed_users_queryset().delete()
+    return deleted
+
+
+class Command(BaseCommand):
+    help = ('Заполняет БД синтетическими пользователями и модулями для замеров производительности. '
+            'Данные детерминированы значением --seed; повторный запуск заменяет ранее созданные данные.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Количество пользователей.')
+        parser.add_argument('--modules', type=int, default=1000, help='Количество модулей.')
+        parser.add_argument('--seed', type=int, default=0, help='Зерно генератора случайных чисел.')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Строк в одной вставке.')
+        parser.add_argument('--password', default='password', help='Пароль всех создаваемых пользователей.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['modules'] < 0:
+            raise CommandError('Нужен хотя бы один пользователь и неотрицательное количество модулей.')
+
+        self.verbosity = options['verbosity']
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        with transaction.atomic():
+            deleted = clear_seed_data()
+            user_ids = self.create_users(options['users'], options['password'], options['batch_size'])
+            self.create_modules(rng, user_ids, options['modules'], options['batch_size'])
+            self.update_module_counts()
+            if connection.vendor == 'postgresql':
+                # Свежая статистика, иначе планировщик оценивает таблицы по состоянию до вставки
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {Module._meta.db_table}, {User._meta.db_table}')
+            transaction.on_commit(bump_version)
+
+        self.stdout.write(
+            f'Удалено модулей: {deleted}. Создано пользователей: {len(user_ids)}, модулей: {options["modules"]} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+
+    @staticmethod
+    def create_users(count, password, batch_size):
+        # Хэш пароля вычисляется один раз: на каждого пользователя он стоил бы десятки миллисекунд
+        password_hash = make_password(password)
+        for offset in range(0, count, batch_size):
+            User.objects.bulk_create(
+                User(email=f'user{index}@{SEED_EMAIL_DOMAIN}', password=password_hash, first_name=f'User {index}')
+                for index in range(offset, min(offset + batch_size, count))
+            )
+        return list(seed_users_queryset().order_by('pk').values_list('pk', flat=True))
+
+    def create_modules(self, rng, user_ids, count, batch_size):
+        now = timezone.now()
+        for offset in range(0, count, batch_size):
+            bulk_insert_modules([
+                Module(
+                    number=index + 1,
+                    name=f'{rng.choice(TOPICS)}: {rng.choice(LEVELS)} {index + 1}',
+                    description=' '.join(rng.choices(WORDS, k=rng.randint(5, 30))).capitalize() + '.',
+                    owner_id=rng.choice(user_ids),
+                    updated_at=now,
+                )
+                for index in range(offset, min(offset + batch_size, count))
+            ])
+            if self.verbosity > 1:
+                self.stdout.write(f'Модулей: {min(offset + batch_size, count)} из {count}')
+
+    @staticmethod
+    def update_module_counts():
+        # Вставка идет без сигналов: денормализованный счетчик пересчитывается одним UPDATE
+        counts = Module.objects.filter(owner=OuterRef('pk')).order_by().values('owner').annotate(
+            total=Count('pk')).values('total')
+        seed_users_queryset().update(module_count=Coalesce(Subquery(counts), Value(0)))
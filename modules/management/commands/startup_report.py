@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+ROLES = ('web', 'celery', 'beat')
+
+# Выполняется в отдельном процессе `python -X importtime`: замеры холодного старта роли.
+# Импорт и готовность приложений замеряются оберткой AppConfig.create.
+BOOTSTRAP = r'''
+import io, json, sys, time
+
+role, path = sys.argv[1], sys.argv[2]
+started = checkpoint = time.perf_counter()
+phases, apps = {}, {}
+
+
+def mark(name):
+    global checkpoint
+    now = time.perf_counter()
+    phases[name] = now - checkpoint
+    checkpoint = now
+
+
+def timed(label, stage, method):
+    def wrapper(*args, **kwargs):
+        began = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            apps[label][stage] += time.perf_counter() - began
+    return wrapper
+
+
+if role != 'web':
+    # Как `celery -A config`: приложение Celery загружается раньше настроек
+    import config.celery
+    mark('celery_app')
+
+import django
+from django.apps.config import AppConfig
+from django.conf import settings
+
+create = AppConfig.create.__func__
+
+
+def timed_create(cls, entry):
+    began = time.perf_counter()
+    app_config = create(cls, entry)
+    apps[app_config.label] = {'import': time.perf_counter() - began, 'models': 0.0, 'ready': 0.0}
+    app_config.import_models = timed(app_config.label, 'models', app_config.import_models)
+    app_config.ready = timed(app_config.label, 'ready', app_config.ready)
+    return app_config
+
+
+AppConfig.create = classmethod(timed_create)
+settings.INSTALLED_APPS
+mark('settings')
+django.setup(set_prefix=False)
+mark('apps')
+
+status = None
+if role == 'web':
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    mark('wsgi_handler')
+    settings.ALLOWED_HOSTS = ['*']
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+    }
+    response = application(environ, lambda code, headers, exc_info=None: None)
+    b''.join(response)
+    status = response.status_code
+    mark('first_request')
+
+phases['total'] = time.perf_counter() - started
+print(json.dumps({'phases': phases, 'apps': apps, 'status': status}))
+'''
+
+IMPORT_TIME = re.compile(r'import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)')
+
+
+class Command(BaseCommand):
+    help = ('Отчет о холодном старте процессов каждой роли (web, celery, beat): время загрузки настроек, '
+            'импорт, модели и ready() каждого приложения, загрузка URLconf и первый запрос, '
+            'а также собственное время импорта по пакетам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--roles', nargs='+', choices=ROLES, default=list(ROLES), help='Роли процессов.')
+        parser.add_argument('--repeat', type=int, default=3, help='Запусков на роль; в отчете медианы.')
+        parser.add_argument('--top', type=int, default=10, help='Сколько самых долгих пакетов показать.')
+        parser.add_argument('--path', default='/modules/', help='Адрес первого запроса веб-процесса.')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть положительным.')
+        for role in options['roles']:
+            runs = [self.run(role, options['path']) for _ in range(options['repeat'])]
+            self.report(role, runs, options['top'])
+
+    @staticmethod
+    def run(role, path):
+        env = {**os.environ, 'PROCESS_ROLE': role}
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOTSTRAP, role, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(f'Процесс роли {role} завершился с ошибкой:\n{process.stderr[-2000:]}')
+
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        packages = Counter()
+        for match in IMPORT_TIME.finditer(process.stderr):
+            packages[match[2].split('.')[0]] += int(match[1]) / 1e6
+        result['packages'] = packages
+        return result
+
+    def report(self, role, runs, top):
+        def median(values):
+            return statistics.median(values) * 1000
+
+        phases = {name: median([run['phases'][name] for run in runs]) for name in runs[0]['phases']}
+        status = f', ответ {runs[0]["status"]}' if runs[0]['status'] else ''
+        self.stdout.write(f'Роль {role}: {phases.pop("total"):.0f} мс (медиана {len(runs)} запусков{status})')
+        for name, value in phases.items():
+            self.stdout.write(f'  {name:<16}{value:8.1f} мс')
+
+        width = max(map(len, runs[0]['apps']), default=0) + 2
+        stages = ''.join(f'{stage:>9}' for stage in ('импорт', 'модели', 'ready'))
+        self.stdout.write(f'  {"Приложения, мс:":<{width + 2}}{stages}')
+        for label in runs[0]['apps']:
+            values = [median([run['apps'][label][stage] for run in runs]) for stage in ('import', 'models', 'ready')]
+            self.stdout.write(f'    {label:<{width}}' + ''.join(f'{value:9.1f}' for value in values))
+
+        packages = Counter({
+            name: median([run['packages'].get(name, 0) for run in runs]) for name in runs[0]['packages']
+        })
+        self.stdout.write(f'  Пакеты (собственное время импорта, всего {sum(packages.values()):.0f} мс):')
+        for name, value in packages.most_common(top):
+            self.stdout.write(f'    {name:<{width}}{value:9.1f} мс')
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_name_trigram_index(apps, schema_editor):
+    # GIN-индекс по триграммам поддерживает поиск admin `name__icontains`, который
+    # в PostgreSQL компилируется в UPPER("name"::text) LIKE UPPER(...)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS module_name_trgm_idx '
+        'ON modules_module USING gin (UPPER(name::text) gin_trgm_ops)'
+    )
+
+
+def drop_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS module_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modules', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['number', 'id'], name='module_number_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['owner', 'number'], name='module_owner_number_idx'),
+        ),
+        migrations.RunPython(create_name_trigram_index, drop_name_trigram_index),
+    ]
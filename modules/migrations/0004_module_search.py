@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:05
+
+from django.db import migrations
+
+# PostgreSQL: столбец tsvector вне модели (не попадает в ModuleSerializer), поддерживается триггером.
+# Название весит больше описания (веса A и B). Конфигурация russian: русская морфология,
+# латиница — английский стеммер.
+POSTGRESQL_CREATE = [
+    'ALTER TABLE modules_module ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    """
+    CREATE OR REPLACE FUNCTION modules_module_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS module_search_vector_trigger ON modules_module',
+    """
+    CREATE TRIGGER module_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON modules_module
+    FOR EACH ROW EXECUTE FUNCTION modules_module_search_vector_update()
+    """,
+    # Заполнение существующих строк: UPDATE name запускает триггер
+    'UPDATE modules_module SET name = name',
+    'CREATE INDEX IF NOT EXISTS module_search_vector_idx ON modules_module USING gin (search_vector)',
+]
+
+POSTGRESQL_DROP = [
+    'DROP INDEX IF EXISTS module_search_vector_idx',
+    'DROP TRIGGER IF EXISTS module_search_vector_trigger ON modules_module',
+    'DROP FUNCTION IF EXISTS modules_module_search_vector_update()',
+    'ALTER TABLE modules_module DROP COLUMN IF EXISTS search_vector',
+]
+
+# SQLite: таблица FTS5 с внешним содержимым, синхронизируется триггерами
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS modules_module_fts USING fts5(
+        name, description, content='modules_module', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_fts_insert AFTER INSERT ON modules_module BEGIN
+        INSERT INTO modules_module_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_fts_delete AFTER DELETE ON modules_module BEGIN
+        INSERT INTO modules_module_fts (modules_module_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_fts_update AFTER UPDATE OF name, description ON modules_module BEGIN
+        INSERT INTO modules_module_fts (modules_module_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO modules_module_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO modules_module_fts (modules_module_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS modules_module_fts_update',
+    'DROP TRIGGER IF EXISTS modules_module_fts_delete',
+    'DROP TRIGGER IF EXISTS modules_module_fts_insert',
+    'DROP TABLE IF EXISTS modules_module_fts',
+]
+
+
+def execute(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search(apps, schema_editor):
+    # PostgreSQL: столбец tsvector с триггером и GIN-индексом; SQLite: таблица FTS5 с триггерами
+    execute(schema_editor, {'postgresql': POSTGRESQL_CREATE, 'sqlite': SQLITE_CREATE})
+
+
+def drop_search(apps, schema_editor):
+    execute(schema_editor, {'postgresql': POSTGRESQL_DROP, 'sqlite': SQLITE_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modules', '0003_module_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search, drop_search),
+    ]
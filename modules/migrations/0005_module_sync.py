@@ -0,0 +1,124 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+# PostgreSQL: версия — 64-битный ID транзакции, изменившей строку
+POSTGRESQL_CREATE_SYNC = [
+    """
+    CREATE OR REPLACE FUNCTION modules_module_version_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := pg_current_xact_id()::text::bigint;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS module_version_trigger ON modules_module',
+    """
+    CREATE TRIGGER module_version_trigger
+    BEFORE INSERT OR UPDATE ON modules_module
+    FOR EACH ROW EXECUTE FUNCTION modules_module_version_update()
+    """,
+]
+
+POSTGRESQL_DROP_SYNC = [
+    'DROP TRIGGER IF EXISTS module_version_trigger ON modules_module',
+    'DROP FUNCTION IF EXISTS modules_module_version_update()',
+]
+
+# SQLite: запись выполняется одной транзакцией за раз, версия — следующий номер по индексу (version, id).
+# Вложенный UPDATE не запускает триггер повторно (recursive_triggers выключены по умолчанию).
+SQLITE_CREATE_SYNC = [
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_version_insert AFTER INSERT ON modules_module BEGIN
+        UPDATE modules_module SET version = (SELECT COALESCE(MAX(version), 0) + 1 FROM modules_module)
+        WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_version_update AFTER UPDATE ON modules_module BEGIN
+        UPDATE modules_module SET version = (SELECT COALESCE(MAX(version), 0) + 1 FROM modules_module)
+        WHERE id = new.id;
+    END
+    """,
+]
+
+SQLITE_DROP_SYNC = [
+    'DROP TRIGGER IF EXISTS modules_module_version_update',
+    'DROP TRIGGER IF EXISTS modules_module_version_insert',
+]
+
+# SQLite пересоздает таблицу при добавлении и удалении столбцов, и ее триггеры удаляются:
+# триггеры таблицы FTS5 из 0004_module_search создаются заново. PostgreSQL таблицу не пересоздает.
+SQLITE_CREATE_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_fts_insert AFTER INSERT ON modules_module BEGIN
+        INSERT INTO modules_module_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_fts_delete AFTER DELETE ON modules_module BEGIN
+        INSERT INTO modules_module_fts (modules_module_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS modules_module_fts_update AFTER UPDATE OF name, description ON modules_module BEGIN
+        INSERT INTO modules_module_fts (modules_module_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO modules_module_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+
+def execute(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_sync(apps, schema_editor):
+    execute(schema_editor, {'sqlite': SQLITE_CREATE_SEARCH_TRIGGERS})
+    execute(schema_editor, {'postgresql': POSTGRESQL_CREATE_SYNC, 'sqlite': SQLITE_CREATE_SYNC})
+
+
+def drop_sync(apps, schema_editor):
+    execute(schema_editor, {'postgresql': POSTGRESQL_DROP_SYNC, 'sqlite': SQLITE_DROP_SYNC})
+
+
+def restore_search(apps, schema_editor):
+    # Откат: удаление столбцов снова пересоздает таблицу в SQLite
+    execute(schema_editor, {'sqlite': SQLITE_CREATE_SEARCH_TRIGGERS})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modules', '0004_module_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search),
+        migrations.AddField(
+            model_name='module',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='version',
+            field=models.BigIntegerField(db_default=0, editable=False, verbose_name='Версия изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['version', 'id'], name='module_version_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(
+                condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='module_deleted_at_idx'
+            ),
+        ),
+        migrations.RunPython(create_sync, drop_sync),
+    ]
@@ -1,6 +1,103 @@
-from django.db import models
+from collections import Counter
+
+from django.db import connections, models, router, transaction
+from django.db.models import F, IntegerField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, pre_delete
 from django.conf import settings
-from users.models import NULLABLE
+from django.utils import timezone
+from modules.cache import bump_version_on_commit
+from users.models import NULLABLE, User
+
+
+class ModuleQuerySet(models.QuerySet):
+    """
+    Операции перенумерации модулей. Применяются к выборке, внутри которой ведется
+    нумерация (обычно — модули одного владельца), и должны выполняться в транзакции.
+    """
+
+    def move(self, module, position):
+        """
+        Ставит модуль на номер `position`. Модули между старым и новым номером сдвигаются
+        на одну позицию одним UPDATE. Возвращает количество измененных модулей.
+        """
+        old = module.number
+        if position == old:
+            return 0
+
+        now = timezone.now()
+        others = self.exclude(pk=module.pk)
+        if position < old:
+            shifted = others.filter(number__gte=position, number__lt=old).update(number=F('number') + 1, updated_at=now)
+        else:
+            shifted = others.filter(number__gt=old, number__lte=position).update(number=F('number') - 1, updated_at=now)
+        self.filter(pk=module.pk).update(number=position, updated_at=now)
+        module.number, module.updated_at = position, now
+        return shifted + 1
+
+    def renumber(self, ids, start=1, batch_size=1000):
+        """
+        Присваивает модулям номера start, start + 1, ... в порядке `ids`.
+        Каждая пачка обновляется одним UPDATE с CASE по ID.
+        """
+        now = timezone.now()
+        pk_column = connections[self.db].ops.quote_name(self.model._meta.pk.column)
+        updated = 0
+        for offset in range(0, len(ids), batch_size):
+            batch = ids[offset:offset + batch_size]
+            # CASE собирается строкой: выражения When на тысячах ID компилируются ORM в десятки раз дольше,
+            # чем выполняется сам UPDATE
+            params = [value for index, pk in enumerate(batch) for value in (pk, start + offset + index)]
+            number = RawSQL(f'CASE {pk_column}{" WHEN %s THEN %s" * len(batch)} END', params, IntegerField())
+            updated += self.filter(pk__in=batch).update(number=number, updated_at=now)
+        return updated
+
+    def delete(self):
+        """
+        Помечает модули выборки удаленными одним UPDATE вместо DELETE: строки остаются
+        tombstone-записями для /modules/changes/ до очистки задачей compact_module_tombstones.
+        Сигналы не отправляются, поэтому счетчики владельцев и кэш обновляются здесь же.
+        """
+        with transaction.atomic(using=self.db):
+            rows = list(self.filter(deleted_at__isnull=True).select_for_update().values_list('pk', 'owner_id'))
+            now = timezone.now()
+            deleted = self.model.all_objects.using(self.db).filter(pk__in=[pk for pk, _ in rows]).update(
+                deleted_at=now, updated_at=now
+            )
+            owners = Counter(owner_id for _, owner_id in rows)
+            for owner_id, count in owners.items():
+                User.objects.shift_module_count(owner_id, -count)
+            if deleted:
+                bump_version_on_commit(*owners)
+        return deleted, {self.model._meta.label: deleted}
+
+    def hard_delete(self, batch_size=1000):
+        """
+        Физически удаляет строки выборки пачками по `batch_size` ID, каждую одним DELETE.
+        Сигналы не отправляются, счетчики владельцев и кэш не меняются: для tombstone-записей
+        и служебных данных, которые уже не учитываются. Возвращает количество удаленных строк.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        pk_column = connection.ops.quote_name(self.model._meta.pk.column)
+        # SQLite ограничивает количество параметров запроса
+        batch_size = min(batch_size, connection.features.max_query_params or batch_size)
+        deleted = 0
+        # Выборка повторяется для каждой пачки: удаленные строки в нее уже не попадают
+        while ids := list(self.values_list('pk', flat=True)[:batch_size]):
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {table} WHERE {pk_column} IN ({", ".join(["%s"] * len(ids))})', ids)
+                deleted += cursor.rowcount
+        return deleted
+
+
+class ModuleManager(models.Manager.from_queryset(ModuleQuerySet)):
+    """
+    Менеджер по умолчанию: только неудаленные модули. Tombstone-записи видны через Module.all_objects.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class Module(models.Model):
@@ -8,11 +105,52 @@ class Module(models.Model):
     name = models.CharField(max_length=100, verbose_name='Название')
     description = models.TextField(verbose_name='Описание', **NULLABLE)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, **NULLABLE, related_name='module')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
+    # Версия изменения для /modules/changes/: выставляется триггером при каждой вставке и изменении (0005_module_sync)
+    version = models.BigIntegerField(db_default=0, editable=False, verbose_name='Версия изменения')
+    # Время удаления: удаленный модуль остается tombstone-записью, пока ее не очистит compact_module_tombstones
+    deleted_at = models.DateTimeField(editable=False, verbose_name='Дата удаления', **NULLABLE)
+
+    objects = ModuleManager()
+    all_objects = ModuleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Владелец на момент загрузки — по нему сигналы определяют передачу модуля
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        return instance
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        Помечает модуль удаленным (tombstone) вместо удаления строки. Отправляет те же сигналы,
+        что и удаление строки: они обновляют счетчик модулей владельца и кэш ответов.
+        """
+        using = using or router.db_for_write(type(self), instance=self)
+        pre_delete.send(sender=type(self), instance=self, using=using, origin=self)
+        now = timezone.now()
+        deleted = type(self).all_objects.using(using).filter(pk=self.pk, deleted_at__isnull=True).update(
+            deleted_at=now, updated_at=now
+        )
+        self.deleted_at = self.updated_at = now
+        if deleted:
+            post_delete.send(sender=type(self), instance=self, using=using, origin=self)
+        return deleted, {self._meta.label: deleted}
+
     class Meta:
         verbose_name = 'Модуль'
         verbose_name_plural = 'Модули'
         ordering = ('number',)
+        indexes = [
+            # Упорядоченный список модулей и keyset-пагинация по (number, id)
+            models.Index(fields=['number', 'id'], name='module_number_id_idx'),
+            # Модули владельца в порядке номеров
+            models.Index(fields=['owner', 'number'], name='module_owner_number_idx'),
+            # Изменения после токена синхронизации по (version, id)
+            models.Index(fields=['version', 'id'], name='module_version_id_idx'),
+            # Очистка старых tombstone-записей
+            models.Index(fields=['deleted_at'], name='module_deleted_at_idx', condition=Q(deleted_at__isnull=False)),
+        ]
@@ -1,7 +1,148 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class ModulesPaginator(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 25
+
+    def get_window(self, queryset, request):
+        """
+        Возвращает срез queryset для запрошенной страницы без подсчета всей таблицы
+        или None, если номер страницы неверный (ошибку вернет сама пагинация).
+        """
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            page_number = int(page_number)
+        except ValueError:
+            return None
+        if page_number < 1:
+            return None
+        offset = (page_number - 1) * page_size
+        return queryset[offset:offset + page_size]
+
+
+class ModulesCursorPaginator(CursorPagination):
+    """
+    Keyset-пагинация по (number, id).
+
+    Позиция курсора — пара значений последней записи страницы, поэтому каждая страница
+    выбирается условием `(number, id) > (x, y)` без `COUNT(*)` и `OFFSET`, и глубокие
+    страницы стоят столько же, сколько первая.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 25
+    ordering = ('number', 'id')
+
+    def get_window(self, queryset, request):
+        """
+        Возвращает срез queryset для страницы, на которую указывает курсор запроса,
+        плюс одну запись, по которой определяется наличие следующей страницы.
+        """
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor.reverse
+        position = cursor.position if cursor is not None else None
+
+        if reverse:
+            queryset = queryset.order_by(*('-' + field for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            number, pk = self._parse_position(position)
+            lookup = 'lt' if reverse else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'number__{lookup}': number}) | Q(number=number, **{f'id__{lookup}': pk})
+            )
+        return queryset[:self.get_page_size(request) + 1]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        results = list(self.get_window(queryset, request))
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+        )
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            return f"{instance['number']}:{instance['id']}"
+        return f'{instance.number}:{instance.id}'
+
+    def _parse_position(self, position):
+        try:
+            number, pk = position.split(':')
+            return int(number), int(pk)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class ModulesSearchPaginator(CursorPagination):
+    """
+    Keyset-пагинация результатов поиска по (релевантность, id), только вперед.
+
+    Курсор — пара значений последней строки страницы; релевантность передается в виде
+    repr(float), чтобы следующая страница начиналась ровно после нее.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 25
+
+    def decode_position(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            score, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split(':')
+            return float(score), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link_for(self, request, score, pk):
+        cursor = base64.urlsafe_b64encode(f'{score!r}:{pk}'.encode()).decode()
+        return replace_query_param(request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_search_response(self, request, results, next_position):
+        return Response({
+            'next': self.get_next_link_for(request, *next_position) if next_position else None,
+            'previous': None,
+            'results': results,
+        })
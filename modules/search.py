@@ -0,0 +1,73 @@
+import re
+
+from django.db.models import Q
+
+from modules.models import Module
+
+# Конфигурация полнотекстового поиска PostgreSQL: русская морфология, латиница — английский стеммер.
+# Должна совпадать с конфигурацией триггера search_vector из миграции 0004_module_search.
+SEARCH_CONFIG = 'russian'
+
+
+# Ранжирование: полнотекстовая релевантность плюс триграммное сходство названия, которое
+# находит модули и при опечатках. UPPER(name) обслуживается индексом module_name_trgm_idx.
+POSTGRESQL_SEARCH = f"""
+    SELECT id, score FROM (
+        SELECT module.id,
+               (ts_rank_cd(module.search_vector, query.tsquery)
+                + similarity(UPPER(module.name::text), UPPER(%(q)s)))::float8 AS score
+        FROM modules_module AS module, websearch_to_tsquery('{SEARCH_CONFIG}', %(q)s) AS query (tsquery)
+        WHERE module.deleted_at IS NULL
+          AND (module.search_vector @@ query.tsquery OR UPPER(module.name::text) %% UPPER(%(q)s))
+    ) AS ranked
+    WHERE %(score)s::float8 IS NULL OR score < %(score)s OR (score = %(score)s AND id > %(id)s)
+    ORDER BY score DESC, id
+    LIMIT %(limit)s
+"""
+
+# bm25 тем меньше, чем релевантнее строка, поэтому берется со знаком минус.
+# Удаленные модули (tombstone-записи) остаются в таблице FTS до очистки и отсекаются соединением.
+SQLITE_SEARCH = """
+    SELECT id, score FROM (
+        SELECT module.id AS id, -bm25(modules_module_fts, 10.0, 1.0) AS score
+        FROM modules_module_fts JOIN modules_module AS module ON module.id = modules_module_fts.rowid
+        WHERE modules_module_fts MATCH %(match)s AND module.deleted_at IS NULL
+    )
+    WHERE %(score)s IS NULL OR score < %(score)s OR (score = %(score)s AND id > %(id)s)
+    ORDER BY score DESC, id
+    LIMIT %(limit)s
+"""
+
+
+def fts5_query(q):
+    # Слова запроса ищутся как префиксы; операторы и кавычки FTS5 из ввода не пропускаются
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', q))
+
+
+def search(connection, q, limit, after=None):
+    """
+    Возвращает до `limit` пар (id, score) в порядке убывания релевантности.
+
+    `after` — пара (score, id) последней строки предыдущей страницы: следующая страница
+    выбирается условием по (score, id), без OFFSET.
+    """
+    score, pk = after if after is not None else (None, None)
+    params = {'q': q, 'score': score, 'id': pk, 'limit': limit}
+
+    if connection.vendor == 'postgresql':
+        sql = POSTGRESQL_SEARCH
+    elif connection.vendor == 'sqlite':
+        params['match'] = fts5_query(q)
+        if not params['match']:
+            return []
+        sql = SQLITE_SEARCH
+    else:
+        # Прочие СУБД: подстрока в названии или описании, без ранжирования
+        queryset = Module.objects.using(connection.alias).filter(Q(name__icontains=q) | Q(description__icontains=q))
+        if pk is not None:
+            queryset = queryset.filter(id__gt=pk)
+        return [(module_id, 0.0) for module_id in queryset.order_by('id').values_list('id', flat=True)[:limit]]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(module_id, float(score)) for module_id, score in cursor.fetchall()]
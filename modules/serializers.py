@@ -1,3 +1,6 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from modules.models import Module
 
@@ -5,4 +8,151 @@ from modules.models import Module
 class ModuleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Module
-        fields = '__all__'
+        # Служебные поля синхронизации (/modules/changes/) не входят в представление модуля
+        exclude = ('version', 'deleted_at')
+
+
+class ValuesSerializer:
+    """
+    Быстрый путь чтения для ModelSerializer без экземпляров модели.
+
+    Строки выбираются через `values()` под именами полей сериализатора, а преобразуются
+    только поля, для которых `to_representation` меняет значение из БД (даты, Decimal и т.п.).
+    Результат совпадает с `serializer_class(...).data` байт в байт после рендеринга.
+    """
+    # Поля, для которых значение из БД уже совпадает с представлением
+    identity_field_classes = (
+        serializers.IntegerField, serializers.CharField, serializers.BooleanField, serializers.PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def fields(self):
+        fields = {name: field for name, field in self.serializer_class().fields.items() if not field.write_only}
+        for name, field in fields.items():
+            if field.source != name:
+                raise ImproperlyConfigured(f'ValuesSerializer не поддерживает source у поля {name!r}.')
+        return fields
+
+    @cached_property
+    def converters(self):
+        converters = []
+        for name, field in self.fields.items():
+            identity = (
+                isinstance(field, self.identity_field_classes)
+                and not getattr(field, 'coerce_to_string', False)
+                and getattr(field, 'pk_field', None) is None
+            )
+            if not identity:
+                converters.append((name, field.to_representation))
+        return converters
+
+    def values(self, queryset):
+        return queryset.values(*self.fields)
+
+    def to_representation(self, row):
+        for name, convert in self.converters:
+            value = row[name]
+            if value is not None:
+                row[name] = convert(value)
+        return row
+
+
+class CommaSeparatedIdsField(serializers.ListField):
+    """
+    Список ID из параметра запроса: `?ids=1,2,3` или `?ids=1&ids=2,3`.
+    """
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        if isinstance(data, list):
+            data = [item.strip() for value in data for item in str(value).split(',') if item.strip()]
+        return super().to_internal_value(data)
+
+
+class BatchIdsSerializer(serializers.Serializer):
+    """
+    Параметры запросов пакетного чтения по ID: непустой список не длиннее `max_length`.
+    """
+
+    def __init__(self, *args, max_length, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['ids'] = CommaSeparatedIdsField(allow_empty=False, max_length=max_length)
+
+
+class ModuleListSerializer(serializers.ListSerializer):
+    """
+    Пакетное создание модулей одним INSERT.
+    """
+
+    def create(self, validated_data):
+        return Module.objects.bulk_create(Module(**attrs) for attrs in validated_data)
+
+
+class ModuleBulkSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор элемента пакетных операций: владельцем всегда становится автор запроса.
+    """
+
+    class Meta:
+        model = Module
+        exclude = ('version', 'deleted_at')
+        read_only_fields = ('owner',)
+        list_serializer_class = ModuleListSerializer
+
+
+class ModuleBulkUpdateSerializer(ModuleBulkSerializer):
+    id = serializers.IntegerField(min_value=1)
+
+    def validate(self, attrs):
+        # При partial=True DRF пропускает отсутствующие обязательные поля, но без `id` строку не обновить
+        if 'id' not in attrs:
+            raise serializers.ValidationError({'id': [self.fields['id'].error_messages['required']]})
+        return super().validate(attrs)
+
+
+class ModuleReorderSerializer(serializers.Serializer):
+    """
+    Перемещение одного модуля (`id` и `position`) или полный порядок модулей (`order`).
+    """
+    id = serializers.IntegerField(min_value=1, required=False)
+    position = serializers.IntegerField(required=False)
+    order = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, required=False)
+
+    def validate_order(self, value):
+        if len(value) > settings.MODULES_REORDER_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'Убедитесь, что в списке не больше {settings.MODULES_REORDER_MAX_SIZE} элементов.'
+            )
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError('ID повторяются в порядке модулей.')
+        return value
+
+    def validate(self, attrs):
+        if 'order' in attrs:
+            if 'id' in attrs or 'position' in attrs:
+                raise serializers.ValidationError('Укажите либо `order`, либо `id` и `position`.')
+        elif 'id' not in attrs or 'position' not in attrs:
+            raise serializers.ValidationError('Укажите `id` и `position` или `order`.')
+        return attrs
+
+
+class ModuleImportSerializer(serializers.Serializer):
+    """
+    Файл для асинхронного импорта модулей.
+    """
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=('csv', 'ndjson'), required=False)
+
+    def validate(self, attrs):
+        if 'file_format' not in attrs:
+            extension = attrs['file'].name.rsplit('.', 1)[-1].lower()
+            formats = {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}
+            if extension not in formats:
+                raise serializers.ValidationError({'file_format': ['Не удалось определить формат по имени файла.']})
+            attrs['file_format'] = formats[extension]
+        return attrs
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from modules.cache import bump_version_on_commit
+from modules.models import Module
+from users.models import User
+
+
+# Подключается раньше update_owner_module_count: тот обновляет владельца на момент загрузки
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def invalidate_module_cache(sender, instance, **kwargs):
+    # Изменения из представлений и из админки сбрасывают кэш списка и карточек модулей,
+    # а кэш /modules/mine/ — у владельца модуля и у прежнего владельца при передаче
+    bump_version_on_commit(instance.owner_id, getattr(instance, '_loaded_owner_id', None))
+
+
+@receiver(post_save, sender=Module)
+def update_owner_module_count(sender, instance, created, **kwargs):
+    """
+    Поддерживает денормализованный счетчик User.module_count при создании и передаче модуля.
+    """
+    previous_owner_id = None if created else getattr(instance, '_loaded_owner_id', instance.owner_id)
+    if instance.owner_id != previous_owner_id:
+        User.objects.shift_module_count(previous_owner_id, -1)
+        User.objects.shift_module_count(instance.owner_id, 1)
+    instance._loaded_owner_id = instance.owner_id
+
+
+@receiver(post_delete, sender=Module)
+def decrease_owner_module_count(sender, instance, **kwargs):
+    User.objects.shift_module_count(instance.owner_id, -1)
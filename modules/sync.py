@@ -0,0 +1,44 @@
+import base64
+import binascii
+import time
+from datetime import timedelta
+
+# Запас к времени жизни tombstone-записей: удаление, выполненное транзакцией, которая началась до выдачи
+# токена, а зафиксирована после, не должно быть очищено раньше, чем истечет этот токен
+TOMBSTONE_GRACE = timedelta(hours=1)
+
+
+def stable_version(connection):
+    """
+    Граница (не включительно), до которой все изменения уже зафиксированы, или None, если
+    граница не нужна. В PostgreSQL это xmin снимка: транзакции с меньшими ID завершены,
+    и новые изменения с версией ниже границы уже не появятся.
+
+    Версию изменения (Module.version) выставляют триггеры из миграции 0005_module_sync: в PostgreSQL —
+    ID транзакции, изменившей строку, в SQLite — следующий номер по индексу (version, id).
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+        return cursor.fetchone()[0]
+
+
+def encode_token(version, pk, issued):
+    """
+    Токен синхронизации: позиция (version, id) последнего переданного изменения и время,
+    начиная с которого клиент получил все удаления (по нему определяется, не очищены ли они).
+    """
+    return base64.urlsafe_b64encode(f'{version}:{pk}:{int(issued)}'.encode()).decode()
+
+
+def decode_token(token):
+    try:
+        version, pk, issued = base64.urlsafe_b64decode(token.encode()).decode().split(':')
+        return int(version), int(pk), int(issued)
+    except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Неверный токен синхронизации.')
+
+
+def token_expired(issued, ttl):
+    return issued < time.time() - ttl
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from itertools import islice
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+# Задачи ставятся в очередь приложением Celery проекта и в веб-процессе, где оно не входит в INSTALLED_APPS
+from config.celery import app  # noqa: F401
+from modules.cache import bump_version_on_commit
+from modules.imports import iter_import_rows, insert_modules
+from modules.models import Module
+from modules.serializers import ModuleBulkSerializer
+from modules.sync import TOMBSTONE_GRACE
+from users.models import User
+
+
+@shared_task(bind=True)
+def import_modules(self, path, owner_id, file_format):
+    """
+    Импортирует модули из загруженного файла пачками по MODULES_IMPORT_BATCH_SIZE строк.
+
+    Некорректные строки пропускаются, первые MODULES_IMPORT_MAX_ERRORS ошибок попадают
+    в результат. Ход выполнения публикуется в состоянии PROGRESS.
+    """
+    progress = {'processed': 0, 'created': 0, 'percent': 0, 'errors': []}
+    total_bytes = default_storage.size(path) or 1
+    try:
+        with default_storage.open(path, 'rb') as raw:
+            rows = iter_import_rows(raw, file_format)
+            while batch := list(islice(rows, settings.MODULES_IMPORT_BATCH_SIZE)):
+                valid = []
+                for line_number, data in batch:
+                    serializer = ModuleBulkSerializer(data=data)
+                    if serializer.is_valid():
+                        valid.append(serializer.validated_data)
+                    elif len(progress['errors']) < settings.MODULES_IMPORT_MAX_ERRORS:
+                        progress['errors'].append({'line': line_number, 'errors': serializer.errors})
+
+                with transaction.atomic():
+                    created = insert_modules(valid, owner_id)
+                    # COPY и bulk_create не отправляют сигналы: счетчик и кэш обновляются явно
+                    User.objects.shift_module_count(owner_id, created)
+                    bump_version_on_commit(owner_id)
+
+                progress['processed'] += len(batch)
+                progress['created'] += created
+                progress['percent'] = min(99, int(raw.tell() * 100 / total_bytes))
+                self.update_state(state='PROGRESS', meta=progress)
+    finally:
+        default_storage.delete(path)
+
+    progress['percent'] = 100
+    return progress
+
+
+@shared_task
+def compact_module_tombstones():
+    """
+    Удаляет tombstone-записи модулей старше MODULES_SYNC_TOMBSTONE_TTL пачками по
+    MODULES_SYNC_COMPACT_BATCH_SIZE строк, каждую в отдельной короткой транзакции.
+    Клиенты с более старым токеном получают 410 и выполняют полную синхронизацию.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.MODULES_SYNC_TOMBSTONE_TTL) - TOMBSTONE_GRACE
+    expired = Module.all_objects.filter(deleted_at__lt=cutoff)
+    return expired.hard_delete(batch_size=settings.MODULES_SYNC_COMPACT_BATCH_SIZE)
@@ -1,8 +1,42 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import tempfile
+import uuid
+from base64 import b64encode
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import admin
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from config import metrics, renderers, schema
+from config.admin import EXACT_COUNT_VAR, EstimatedCountPaginator
+from config.db import get_pool_stats
+from config.celery import app as celery_app
+from config.middleware import ReplicaPinningMiddleware
+from config.routers import ReplicaRouter, replicas
+from config.renderers import ORJSONRenderer
+from modules import cache as modules_cache
 from modules.models import Module
+from modules.serializers import ModuleSerializer, ValuesSerializer
+from modules.tasks import compact_module_tombstones, import_modules
+from users.serializers import UserTokenObtainPairSerializer
 
 User = get_user_model()
 
@@ -12,6 +46,7 @@ class ModulesAPITest(TestCase):
 
     def setUp(self):
         """Настройка для каждого теста."""
+        cache.clear()  # Очищаем кэш ответов, общий для всех тестов процесса
         self.client = APIClient()  # Создаем клиента API
         self.user = User.objects.create_user(email='testuser@example.com', password='testpass')  # Создаем тестового пользователя
         self.client.force_authenticate(user=self.user)  # Аутентифицируем клиента с помощью тестового пользователя
@@ -73,4 +108,1228 @@ class ModulesAPITest(TestCase):
 
         # Пытаемся удалить модуль, принадлежащий другому пользователю
         response = self.client.delete(f'/modules/delete/{module.id}/')  # Отправляем DELETE-запрос на удаление модуля
-        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)  # Проверяем, что код ответа 404 (Не найдено)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)  # Проверяем, что код ответа 404 (Не найдено)
+
+
+class ModulesCursorPaginationTest(TestCase):
+    """Тесты keyset-пагинации списка модулей."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='cursor@example.com', password='testpass')
+        # Повторяющиеся номера проверяют, что id используется как дополнительный ключ
+        for i in range(7):
+            Module.objects.create(number=i // 2, name=f'Module {i}', owner=self.user)
+
+    def test_cursor_mode_skips_count(self):
+        """Курсорный режим не считает общее количество записей."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/modules/', {'pagination': 'cursor', 'page_size': 3})
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['previous'])
+
+    def test_cursor_walks_all_pages(self):
+        """Проход по курсорам вперед и назад возвращает все модули без пропусков и повторов."""
+        expected = list(Module.objects.order_by('number', 'id').values_list('id', flat=True))
+        seen, pages = [], []
+        url = '/modules/?pagination=cursor&page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([item['id'] for item in response.data['results']])
+            seen.extend(pages[-1])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([item['id'] for item in response.data['results']], pages[-2])
+
+    def test_invalid_cursor(self):
+        """Некорректный курсор возвращает 404."""
+        response = self.client.get('/modules/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_by_default(self):
+        """Без параметров сохраняется постраничный режим с `count`."""
+        response = self.client.get('/modules/')
+        self.assertEqual(response.data['count'], 7)
+
+
+class ModuleOwnerCounterTest(TestCase):
+    """Тесты синхронизации денормализованного счетчика модулей владельца."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='owner@example.com', password='testpass')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+
+    def test_create_update_destroy(self):
+        """Создание, передача и удаление модуля изменяют счетчики владельцев."""
+        response = self.client.post('/modules/create/', {'number': 1, 'name': 'Module'}, format='json')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.module_count, 1)
+        self.assertEqual(response.data['owner'], self.user.pk)
+
+        module_id = response.data['id']
+        update_data = {'number': 1, 'name': 'Module', 'owner': self.other.pk}
+        self.client.put(f'/modules/update/{module_id}/', update_data, format='json')
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.user.module_count, self.other.module_count), (0, 1))
+
+        self.client.force_authenticate(user=self.other)
+        self.client.delete(f'/modules/delete/{module_id}/')
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.module_count, 0)
+
+
+class ModuleIndexPlanTest(TestCase):
+    """Проверка планов запросов: выборки модулей должны использовать индексы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owners = [User.objects.create_user(email=f'owner{i}@example.com', password='testpass') for i in range(10)]
+        Module.objects.bulk_create(
+            Module(number=i, name=f'Module {i}', owner=owners[i % len(owners)]) for i in range(2000)
+        )
+        cls.owner = owners[0]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # На небольшом наборе данных планировщик предпочитает последовательное сканирование
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_ordered_listing_uses_number_index(self):
+        plan = self.explain(Module.objects.order_by('number', 'id')[:20])
+        self.assertIn('module_number_id_idx', plan)
+
+    def test_owner_listing_uses_owner_number_index(self):
+        plan = self.explain(Module.objects.filter(owner=self.owner).order_by('number'))
+        self.assertIn('module_owner_number_idx', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Триграммный индекс создается только в PostgreSQL')
+    def test_admin_search_uses_trigram_index(self):
+        plan = self.explain(Module.objects.filter(name__icontains='dule 15'))
+        self.assertIn('module_name_trgm_idx', plan)
+
+
+class ModulesAdminTest(TestCase):
+    """Тесты списка модулей в админке."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(email='admin@example.com', password='x')
+        self.client.force_login(self.admin_user)
+        self.owners = [User.objects.create(email=f'admin-owner{i}@example.com', password='x') for i in range(3)]
+        self.create_modules(self.owners, 30)
+
+    @staticmethod
+    def create_modules(owners, count):
+        Module.objects.bulk_create(
+            Module(number=i, name=f'Module {i}', owner=owners[i % len(owners)]) for i in range(count)
+        )
+
+    def get_changelist(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/modules/module/', params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_owners_loaded_with_join(self):
+        _, queries = self.get_changelist()
+        # Новые строки и владельцы не добавляют запросов
+        extra_owners = [User.objects.create(email=f'admin-extra{i}@example.com', password='x') for i in range(20)]
+        self.create_modules(extra_owners, 40)
+        response, more_queries = self.get_changelist()
+        self.assertEqual(response.context['cl'].result_count, 70)
+        self.assertEqual(more_queries, queries)
+
+    def test_owner_autocomplete_filter(self):
+        owner = self.owners[1]
+        response, _ = self.get_changelist({'owner__id__exact': owner.pk})
+        self.assertEqual(response.context['cl'].result_count, 10)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(response, f'<option value="{owner.pk}" selected>{owner.email}</option>', html=True)
+        # Фильтр не перечисляет всех пользователей
+        self.assertNotContains(response, f'owner__id__exact={self.owners[0].pk}')
+
+        Module.objects.create(number=100, name='Orphan')
+        response, _ = self.get_changelist({'owner__isnull': 'True'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_owner_autocomplete_search(self):
+        response = self.client.get('/admin/autocomplete/', {
+            'app_label': 'modules', 'model_name': 'module', 'field_name': 'owner', 'term': 'owner2',
+        })
+        self.assertEqual([item['text'] for item in response.json()['results']], ['admin-owner2@example.com'])
+
+    def test_estimated_count(self):
+        # Подменяется только чтение статистики PostgreSQL: выборка списка проверяется настоящая
+        with mock.patch.object(EstimatedCountPaginator, 'table_estimate', return_value=10 ** 7) as table_estimate:
+            response, _ = self.get_changelist()
+            self.assertTrue(response.context['cl'].paginator.is_unfiltered())
+            table_estimate.assert_called_once()
+            self.assertEqual(response.context['cl'].result_count, 10 ** 7)
+            self.assertIsNone(response.context['cl'].full_result_count)
+
+            # Отфильтрованный список считается точно, статистика таблицы не читается
+            table_estimate.reset_mock()
+            response, _ = self.get_changelist({'owner__id__exact': self.owners[0].pk})
+            self.assertFalse(response.context['cl'].paginator.is_unfiltered())
+            table_estimate.assert_not_called()
+            self.assertEqual(response.context['cl'].result_count, 10)
+
+            response, _ = self.get_changelist({EXACT_COUNT_VAR: '1'})
+            self.assertEqual(response.context['cl'].result_count, 30)
+            self.assertIn(f'{EXACT_COUNT_VAR}=1', response.context['cl'].get_query_string({'p': 2}))
+
+    def test_soft_delete_filter_keeps_estimate(self):
+        """Скрытие удаленных модулей менеджером по умолчанию не отключает оценку количества."""
+        request = RequestFactory().get('/admin/modules/module/')
+        request.user = self.admin_user
+        queryset = admin.site._registry[Module].get_queryset(request)
+        self.assertIn('deleted_at', str(queryset.query))
+        self.assertTrue(EstimatedCountPaginator(queryset, 100).is_unfiltered())
+        self.assertFalse(EstimatedCountPaginator(queryset.filter(number__gt=5), 100).is_unfiltered())
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_small_estimate_is_exact(self):
+        with mock.patch.object(EstimatedCountPaginator, 'table_estimate', return_value=999):
+            self.assertEqual(EstimatedCountPaginator(Module.objects.all(), 100).count, 30)
+        # Отфильтрованная выборка и другие СУБД не оцениваются
+        self.assertIsNone(EstimatedCountPaginator(Module.objects.filter(number__gt=5), 100).estimate_count())
+        if connection.vendor != 'postgresql':
+            self.assertIsNone(EstimatedCountPaginator(Module.objects.all(), 100).estimate_count())
+
+
+class ModulesCacheTest(TestCase):
+    """Тесты кэширования списка и карточек модулей."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='cache@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.module = Module.objects.create(number=1, name='Module 1', owner=self.user)
+
+    def test_list_served_from_cache(self):
+        """Повторный запрос той же страницы выполняет только запрос для ETag."""
+        self.client.get('/modules/', {'page_size': 5})
+        with self.assertNumQueries(1):
+            response = self.client.get('/modules/', {'page_size': 5})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(modules_cache.get_stats(), {'hits': 1, 'misses': 1})
+
+    def test_detail_served_from_cache(self):
+        self.client.get(f'/modules/{self.module.pk}/')
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/modules/{self.module.pk}/')
+        self.assertEqual(response.data['name'], 'Module 1')
+
+    def test_write_invalidates_cache(self):
+        """Изменение модуля через API сбрасывает закэшированные страницы после фиксации транзакции."""
+        self.client.get('/modules/')
+        self.client.get(f'/modules/{self.module.pk}/')
+        update_data = {'number': 1, 'name': 'Renamed'}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/modules/update/{self.module.pk}/', update_data, format='json')
+        self.assertEqual(self.client.get('/modules/').data['results'][0]['name'], 'Renamed')
+        self.assertEqual(self.client.get(f'/modules/{self.module.pk}/').data['name'], 'Renamed')
+
+    def test_admin_save_invalidates_cache(self):
+        """Сохранение модели вне API (например, из админки) тоже меняет версию кэша."""
+        version = modules_cache.get_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module.save()
+        self.assertNotEqual(modules_cache.get_version(), version)
+
+
+class ModulesMineTest(TestCase):
+    """Тесты списка модулей текущего пользователя и его кэша."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='mine@example.com', password='testpass')
+        self.other = User.objects.create_user(email='mine-other@example.com', password='testpass')
+        self.own = Module.objects.create(number=2, name='Own', owner=self.user)
+        self.foreign = Module.objects.create(number=1, name='Foreign', owner=self.other)
+
+    def test_lists_only_own_modules(self):
+        self.assertEqual(self.client.get('/modules/mine/').status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/modules/mine/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.data['results']], ['Own'])
+        response = self.client.get('/modules/mine/', {'pagination': 'cursor'})
+        self.assertEqual([item['name'] for item in response.data['results']], ['Own'])
+
+    def test_served_from_cache(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/modules/mine/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/modules/mine/')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_other_owner_write_keeps_cache(self):
+        """Изменение чужого модуля не меняет версию кэша владельца, изменение своего — меняет."""
+        key = modules_cache.owner_version_key(self.user.pk)
+        version = modules_cache.get_version(key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.foreign.save()
+        self.assertEqual(modules_cache.get_version(key), version)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.own.save()
+        self.assertNotEqual(modules_cache.get_version(key), version)
+
+    def test_transfer_invalidates_both_owners(self):
+        keys = [modules_cache.owner_version_key(user.pk) for user in (self.user, self.other)]
+        versions = [modules_cache.get_version(key) for key in keys]
+        module = Module.objects.get(pk=self.own.pk)
+        module.owner = self.other
+        with self.captureOnCommitCallbacks(execute=True):
+            module.save()
+        self.assertTrue(all(modules_cache.get_version(key) != version for key, version in zip(keys, versions)))
+
+    def test_bulk_write_invalidates_owner_cache(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/modules/mine/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/modules/bulk/', [{'number': 3, 'name': 'Bulk'}], format='json')
+        self.assertEqual(self.client.get('/modules/mine/').data['count'], 2)
+
+    @override_settings(USERS_JWT_CLAIMS_USER=True)
+    def test_claims_user(self):
+        token = UserTokenObtainPairSerializer.get_token(self.user).access_token
+        response = self.client.get('/modules/mine/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.data['results']], ['Own'])
+
+
+class ModulesBatchTest(TestCase):
+    """Тесты получения нескольких модулей по списку ID."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='batch@example.com', password='testpass')
+        self.modules = [Module.objects.create(number=i, name=f'Module {i}', owner=self.user) for i in range(3)]
+
+    def test_requires_authentication(self):
+        response = self.client.get('/modules/batch/', {'ids': self.modules[0].pk})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_preserves_order_and_reports_missing(self):
+        self.client.force_authenticate(user=self.user)
+        ids = [self.modules[2].pk, 999999, self.modules[0].pk, self.modules[2].pk]
+        with self.assertNumQueries(1):
+            response = self.client.get('/modules/batch/', {'ids': ','.join(map(str, ids))})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item and item['name'] for item in response.data['results']],
+                         ['Module 2', None, 'Module 0', 'Module 2'])
+        self.assertEqual(response.data['results'][0], ModuleSerializer(self.modules[2]).data)
+        self.assertEqual(response.data['missing'], [999999])
+
+    def test_repeated_parameter(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/modules/batch/?ids={self.modules[0].pk}&ids={self.modules[1].pk}')
+        self.assertEqual([item['id'] for item in response.data['results']], [m.pk for m in self.modules[:2]])
+
+    @override_settings(MODULES_BATCH_MAX_SIZE=2)
+    def test_invalid_ids(self):
+        self.client.force_authenticate(user=self.user)
+        for params in ({}, {'ids': ''}, {'ids': '1,x'}, {'ids': '0'}, {'ids': '1,2,3'}):
+            response = self.client.get('/modules/batch/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn('ids', response.data)
+
+
+class ModulesChangesTest(TestCase):
+    """Тесты инкрементальной синхронизации и tombstone-записей удаленных модулей."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='sync@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.modules = [Module.objects.create(number=i, name=f'Module {i}', owner=self.user) for i in range(3)]
+
+    def changes(self, token=None, **params):
+        if token is not None:
+            params['since'] = token
+        response = self.client.get('/modules/changes/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_returns_only_changes_after_token(self):
+        data = self.changes()
+        self.assertEqual([item['name'] for item in data['updated']], ['Module 0', 'Module 1', 'Module 2'])
+        self.assertEqual(data['updated'][0], ModuleSerializer(self.modules[0]).data)
+        self.assertFalse(data['has_more'])
+        token = data['token']
+
+        self.client.put(f'/modules/update/{self.modules[1].pk}/', {'number': 1, 'name': 'Renamed'}, format='json')
+        self.client.post('/modules/create/', {'number': 3, 'name': 'New'}, format='json')
+        self.client.delete(f'/modules/delete/{self.modules[0].pk}/')
+        data = self.changes(token)
+        self.assertEqual([item['name'] for item in data['updated']], ['Renamed', 'New'])
+        self.assertEqual(data['deleted'], [self.modules[0].pk])
+        self.assertEqual(self.changes(data['token'])['updated'], [])
+
+    def test_pages_by_version(self):
+        pages, token, has_more = [], None, True
+        while has_more:
+            data = self.changes(token, page_size=2)
+            pages.append([item['id'] for item in data['updated']])
+            token, has_more = data['token'], data['has_more']
+        self.assertEqual(pages, [[self.modules[0].pk, self.modules[1].pk], [self.modules[2].pk]])
+
+    def test_uses_version_index(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = Module.all_objects.filter(version__gt=5).order_by('version', 'id')[:100].explain()
+        self.assertIn('module_version_id_idx', plan)
+
+    def test_invalid_and_expired_tokens(self):
+        response = self.client.get('/modules/changes/', {'since': 'bad'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        token = self.changes()['token']
+        with override_settings(MODULES_SYNC_TOMBSTONE_TTL=-1):
+            response = self.client.get('/modules/changes/', {'since': token})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_tombstones_hidden_from_reads(self):
+        deleted = self.modules[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete('/modules/bulk/', [deleted.pk], format='json')
+        self.assertTrue(Module.all_objects.filter(pk=deleted.pk, deleted_at__isnull=False).exists())
+        self.assertEqual(self.client.get('/modules/').data['count'], 2)
+        self.assertEqual(self.client.get('/modules/mine/').data['count'], 2)
+        self.assertEqual(self.client.get(f'/modules/{deleted.pk}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/modules/batch/', {'ids': deleted.pk}).data['missing'], [deleted.pk])
+        self.assertEqual(len(self.client.get('/modules/search/', {'q': 'Module'}).data['results']), 2)
+        self.assertEqual(b''.join(self.client.get('/modules/export/').streaming_content).count(b'\n'), 2)
+        self.assertEqual(self.user.module.count(), 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.module_count, 2)
+
+        # Повторное удаление tombstone-записи не меняет счетчик
+        deleted.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.module_count, 2)
+
+    def test_compaction_removes_old_tombstones(self):
+        self.modules[0].delete()
+        self.modules[1].delete()
+        Module.all_objects.filter(pk=self.modules[0].pk).update(deleted_at=timezone.now() - timedelta(days=365))
+        with override_settings(MODULES_SYNC_COMPACT_BATCH_SIZE=1):
+            self.assertEqual(compact_module_tombstones(), 1)
+        self.assertEqual(
+            list(Module.all_objects.order_by('pk').values_list('pk', flat=True)),
+            [self.modules[1].pk, self.modules[2].pk],
+        )
+        schedule = settings.CELERY_BEAT_SCHEDULE['compact-module-tombstones']
+        self.assertEqual(schedule['task'], 'modules.tasks.compact_module_tombstones')
+
+
+class ModulesConditionalGetTest(TestCase):
+    """Тесты условных GET-запросов (ETag / Last-Modified)."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='etag@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.module = Module.objects.create(number=1, name='Module 1', owner=self.user)
+        Module.objects.create(number=2, name='Module 2', owner=self.user)
+
+    def test_list_not_modified(self):
+        """Совпадающий ETag дает 304 без выборки и сериализации страницы."""
+        etag = self.client.get('/modules/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/modules/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_list_etag_changes(self):
+        """ETag списка меняется при изменении, добавлении и удалении модулей."""
+        etags = {self.client.get('/modules/')['ETag']}
+        self.module.name = 'Renamed'
+        self.module.save()
+        etags.add(self.client.get('/modules/')['ETag'])
+        Module.objects.filter(number=2).delete()
+        etags.add(self.client.get('/modules/')['ETag'])
+        self.assertEqual(len(etags), 3)
+        self.assertNotEqual(
+            self.client.get('/modules/', {'page_size': 1})['ETag'], self.client.get('/modules/')['ETag']
+        )
+
+    def test_list_etag_changes_outside_page(self):
+        """Изменение за пределами страницы меняет `count` ответа и, значит, ETag."""
+        etag = self.client.get('/modules/', {'page_size': 1})['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Module.objects.create(number=3, name='Module 3', owner=self.user)
+        response = self.client.get('/modules/', {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+
+    def test_cursor_page_not_modified(self):
+        etag = self.client.get('/modules/', {'pagination': 'cursor'})['ETag']
+        response = self.client.get('/modules/', {'pagination': 'cursor'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_not_modified(self):
+        """Карточка модуля отвечает 304 по ETag и по Last-Modified."""
+        response = self.client.get(f'/modules/{self.module.pk}/')
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(f'/modules/{self.module.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        last_modified = self.client.get(f'/modules/{self.module.pk}/')['Last-Modified']
+        response = self.client.get(f'/modules/{self.module.pk}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_missing(self):
+        response = self.client.get('/modules/999999/', HTTP_IF_NONE_MATCH='"anything"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ModulesBulkAPITest(TestCase):
+    """Тесты пакетных операций с модулями."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='bulk@example.com', password='testpass')
+        self.other = User.objects.create_user(email='bulk-other@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_constant_queries(self):
+        """Создание пакета модулей не зависит по числу запросов от размера пакета."""
+        payload = [{'number': i, 'name': f'Module {i}'} for i in range(50)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/modules/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLessEqual(len(queries), 5)
+        self.assertEqual(len(response.data), 50)
+        self.assertTrue(all(item['owner'] == self.user.pk and item['id'] for item in response.data))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.module_count, 50)
+
+    def test_bulk_create_reports_item_errors(self):
+        """Ошибка в одном элементе отклоняет весь пакет и возвращается по индексу."""
+        payload = [{'number': 1, 'name': 'Valid'}, {'number': 'x', 'name': 'Invalid'}]
+        response = self.client.post('/modules/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn(0, response.data)
+        self.assertIn('number', response.data[1])
+        self.assertEqual(Module.objects.count(), 0)
+
+    def test_bulk_update(self):
+        own = [Module.objects.create(number=i, name=f'Module {i}', owner=self.user) for i in range(3)]
+        payload = [{'id': module.pk, 'name': f'Renamed {module.pk}'} for module in own]
+        response = self.client.patch('/modules/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(Module.objects.values_list('name', flat=True)), {f'Renamed {module.pk}' for module in own}
+        )
+
+    def test_bulk_update_foreign_module(self):
+        """Чужие модули не обновляются, ошибка указывает на элемент."""
+        own = Module.objects.create(number=1, name='Own', owner=self.user)
+        foreign = Module.objects.create(number=2, name='Foreign', owner=self.other)
+        payload = [{'id': own.pk, 'name': 'Changed'}, {'id': foreign.pk, 'name': 'Changed'}]
+        response = self.client.patch('/modules/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data), [1])
+        self.assertIn('id', response.data[1])
+        own.refresh_from_db()
+        self.assertEqual(own.name, 'Own')
+
+    def test_bulk_partial_update_requires_id(self):
+        """Элемент без `id` отклоняется и при частичном обновлении."""
+        own = Module.objects.create(number=1, name='Own', owner=self.user)
+        payload = [{'id': own.pk, 'name': 'Changed'}, {'name': 'x'}]
+        response = self.client.patch('/modules/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data[1])
+        own.refresh_from_db()
+        self.assertEqual(own.name, 'Own')
+
+    def test_bulk_delete(self):
+        own = [Module.objects.create(number=i, name=f'Module {i}', owner=self.user) for i in range(3)]
+        foreign = Module.objects.create(number=9, name='Foreign', owner=self.other)
+
+        response = self.client.delete('/modules/bulk/', [own[0].pk, foreign.pk], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Module.objects.count(), 4)
+
+        response = self.client.delete('/modules/bulk/', [module.pk for module in own], format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Module.objects.values_list('pk', flat=True)), [foreign.pk])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.module_count, 0)
+
+    @override_settings(MODULES_BULK_MAX_SIZE=2)
+    def test_bulk_max_size(self):
+        payload = [{'number': i, 'name': f'Module {i}'} for i in range(3)]
+        response = self.client.post('/modules/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ModulesReorderTest(TestCase):
+    """Тесты изменения порядка модулей."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='reorder@example.com', password='testpass')
+        self.other = User.objects.create_user(email='reorder-other@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.modules = [Module.objects.create(number=i, name=f'Module {i}', owner=self.user) for i in range(1, 6)]
+        self.foreign = Module.objects.create(number=3, name='Foreign', owner=self.other)
+
+    def numbers(self):
+        return list(Module.objects.filter(owner=self.user).order_by('number').values_list('name', 'number'))
+
+    def test_move_up_constant_queries(self):
+        """Перемещение выполняется одним UPDATE сдвига независимо от длины диапазона."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/modules/reorder/', {'id': self.modules[4].pk, 'position': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 4})
+        self.assertLessEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 2)
+        self.assertEqual(self.numbers(), [
+            ('Module 1', 1), ('Module 5', 2), ('Module 2', 3), ('Module 3', 4), ('Module 4', 5),
+        ])
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.number, 3)
+
+    def test_move_down(self):
+        response = self.client.post('/modules/reorder/', {'id': self.modules[0].pk, 'position': 4}, format='json')
+        self.assertEqual(response.data, {'updated': 4})
+        self.assertEqual(self.numbers(), [
+            ('Module 2', 1), ('Module 3', 2), ('Module 4', 3), ('Module 1', 4), ('Module 5', 5),
+        ])
+
+    def test_move_foreign_module(self):
+        response = self.client.post('/modules/reorder/', {'id': self.foreign.pk, 'position': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data)
+
+    def test_order(self):
+        order = [module.pk for module in reversed(self.modules)]
+        response = self.client.post('/modules/reorder/', {'order': order}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 5})
+        self.assertEqual([name for name, _ in self.numbers()], [f'Module {i}' for i in range(5, 0, -1)])
+
+    def test_order_must_list_all_own_modules(self):
+        order = [module.pk for module in self.modules]
+        for payload in (order[:-1], order + [self.foreign.pk], order + order[:1]):
+            with self.subTest(payload=payload):
+                response = self.client.post('/modules/reorder/', {'order': payload}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.numbers(), [(f'Module {i}', i) for i in range(1, 6)])
+
+    def test_invalid_payload(self):
+        for payload in ({}, {'id': self.modules[0].pk}, {'order': [1], 'id': 1, 'position': 1}):
+            with self.subTest(payload=payload):
+                response = self.client.post('/modules/reorder/', payload, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reorder_invalidates_cache(self):
+        self.client.get('/modules/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/modules/reorder/', {'id': self.modules[4].pk, 'position': 1}, format='json')
+        response = self.client.get('/modules/')
+        self.assertEqual(response.data['results'][0]['name'], 'Module 5')
+
+
+class SeedDataTest(TestCase):
+    """Тесты генератора синтетических данных и набора замеров."""
+
+    def seed(self, **options):
+        call_command('seed_data', stdout=io.StringIO(), **options)
+        return list(Module.objects.order_by('number').values_list('number', 'name', 'description'))
+
+    def test_seed_is_deterministic_and_replaces_previous_data(self):
+        first = self.seed(users=5, modules=50, seed=1)
+        self.assertEqual(len(first), 50)
+        self.assertEqual(self.seed(users=5, modules=50, seed=1), first)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(sum(User.objects.values_list('module_count', flat=True)), 50)
+        self.assertNotEqual(self.seed(users=5, modules=50, seed=2), first)
+
+    def test_benchmark_covers_endpoints(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            stdout = io.StringIO()
+            call_command('benchmark_api', sizes=[50], requests=2, output=output.name, stdout=stdout)
+            report = json.load(output)
+        self.assertNotIn('Нет сценариев', stdout.getvalue())
+        self.assertEqual(report['meta']['vendor'], connection.vendor)
+        endpoints = {item['endpoint'] for item in report['results']}
+        self.assertIn('modules:modules_search', endpoints)
+        self.assertIn('users:user-list', endpoints)
+        for item in report['results']:
+            self.assertTrue(all(code < '400' for code in item['statuses']), item)
+
+    def test_benchmark_refuses_foreign_data(self):
+        Module.objects.create(number=1, name='Real module')
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', sizes=[50], requests=2, stdout=io.StringIO())
+
+
+class ModulesExportTest(TestCase):
+    """Тесты потоковой выгрузки модулей."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='export@example.com', password='testpass')
+        self.other = User.objects.create_user(email='export-other@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        Module.objects.create(number=2, name='Модуль, "второй"', description='Строка\nвторая', owner=self.user)
+        Module.objects.create(number=1, name='Module 1', owner=self.other)
+
+    def get_content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_matches_serializer(self):
+        """Строки NDJSON совпадают с представлением ModuleSerializer."""
+        response = self.client.get('/modules/export/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in self.get_content(response).decode().splitlines()]
+        self.assertEqual(rows, ModuleSerializer(Module.objects.order_by('number', 'id'), many=True).data)
+        # Порядок ключей тоже совпадает: потребители полагаются на порядок столбцов
+        self.assertEqual(list(rows[0]), list(ModuleSerializer().fields))
+
+    def test_csv_owner_subset(self):
+        response = self.client.get('/modules/export/', {'output': 'csv', 'owner': self.user.pk})
+        rows = list(csv.reader(io.StringIO(self.get_content(response).decode())))
+        self.assertEqual(rows[0], list(ModuleSerializer().fields))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2:4], ['Модуль, "второй"', 'Строка\nвторая'])
+
+    def test_gzip(self):
+        response = self.client.get('/modules/export/', {'gzip': 'true'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(gzip.decompress(self.get_content(response)).splitlines()), 2)
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get('/modules/export/', {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/modules/export/', {'owner': 'me'}).status_code, 400)
+
+
+@override_settings(MODULES_IMPORT_BATCH_SIZE=2)
+class ModulesImportTest(TestCase):
+    """Тесты асинхронного импорта модулей (задачи Celery выполняются синхронно)."""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+        previous = celery_app.conf.task_always_eager, celery_app.conf.task_store_eager_result
+        celery_app.conf.task_always_eager = celery_app.conf.task_store_eager_result = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', previous[0])
+        self.addCleanup(setattr, celery_app.conf, 'task_store_eager_result', previous[1])
+        # Настройки копируются в атрибуты задачи при финализации приложения, если она уже произошла
+        self.enterContext(mock.patch.object(import_modules, 'store_eager_result', True))
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='import@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, name, content):
+        return self.client.post('/modules/import/', {'file': SimpleUploadedFile(name, content.encode())})
+
+    def test_csv_import(self):
+        """CSV импортируется пачками, ошибки строк попадают в результат."""
+        content = 'number,name,description\n1,First,Desc\n2,Second,\nx,Broken,\n3,Third,"Много\nстрок"\n'
+        response = self.upload('modules.csv', content)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        response = self.client.get(response.data['status_url'])
+        self.assertEqual(response.data['state'], 'SUCCESS')
+        progress = response.data['progress']
+        self.assertEqual((progress['processed'], progress['created'], progress['percent']), (4, 3, 100))
+        self.assertEqual(progress['errors'][0]['line'], 4)
+
+        self.assertEqual(list(Module.objects.values_list('name', flat=True)), ['First', 'Second', 'Third'])
+        self.assertEqual(Module.objects.get(number=3).description, 'Много\nстрок')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.module_count, 3)
+
+    def test_ndjson_import(self):
+        content = '{"number": 1, "name": "First"}\nnot json\n{"number": 2, "name": "Second"}\n'
+        response = self.client.get(self.upload('modules.jsonl', content).data['status_url'])
+        self.assertEqual(response.data['progress']['created'], 2)
+        self.assertEqual(response.data['progress']['errors'][0]['line'], 2)
+
+    def test_unknown_format(self):
+        response = self.upload('modules.txt', '1,First')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_status_of_foreign_import(self):
+        status_url = self.upload('modules.csv', 'number,name\n1,First\n').data['status_url']
+        self.client.force_authenticate(user=User.objects.create_user(email='spy@example.com', password='x'))
+        self.assertEqual(self.client.get(status_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_status_of_unknown_import(self):
+        response = self.client.get(f'/modules/import/{uuid.uuid4()}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_status_of_queued_import(self):
+        """Задача в очереди (аргументы еще не сохранены) видна только своему владельцу."""
+        with mock.patch.object(import_modules, 'apply_async') as apply_async:
+            apply_async.return_value.id = str(uuid.uuid4())
+            status_url = self.upload('modules.csv', 'number,name\n1,First\n').data['status_url']
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['state'], 'PENDING')
+        self.client.force_authenticate(user=User.objects.create_user(email='spy@example.com', password='x'))
+        self.assertEqual(self.client.get(status_url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ValuesSerializerTest(TestCase):
+    """Быстрый путь чтения должен давать тот же JSON, что и ModuleSerializer."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='values@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        Module.objects.create(number=1, name='Модуль "1"', description='Описание', owner=self.user)
+        Module.objects.create(number=2, name='Module 2')
+
+    def test_list_output_identical(self):
+        response = self.client.get('/modules/')
+        expected = ModuleSerializer(Module.objects.all(), many=True).data
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render({'count': 2, 'next': None, 'previous': None, 'results': expected}),
+        )
+
+    def test_detail_output_identical(self):
+        module = Module.objects.get(number=1)
+        response = self.client.get(f'/modules/{module.pk}/')
+        self.assertEqual(response.content, JSONRenderer().render(ModuleSerializer(module).data))
+
+    def test_values_serializer_fields(self):
+        values_serializer = ValuesSerializer(ModuleSerializer)
+        self.assertEqual(list(values_serializer.fields), list(ModuleSerializer().fields))
+        self.assertEqual([name for name, _ in values_serializer.converters], ['updated_at'])
+
+
+class RenderersTest(TestCase):
+    """Тесты рендереров и парсеров orjson/MessagePack."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='renderers@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        Module.objects.create(number=1, name='Модуль\u2028"1"', description='Описание', owner=self.user)
+
+    def test_orjson_output_identical(self):
+        data = {'results': ModuleSerializer(Module.objects.all(), many=True).data, 'price': Decimal('1.50')}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fallback_without_orjson(self):
+        data = ModuleSerializer(Module.objects.get()).data
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_orjson_parser(self):
+        response = self.client.post('/modules/create/', data=b'{"number": 2, "name": "\xd0\x9c"}',
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Module.objects.get(number=2).name, 'М')
+
+        response = self.client.post('/modules/create/', data=b'{"number":', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @skipUnless(renderers.msgpack, 'msgpack не установлен')
+    def test_msgpack_negotiation(self):
+        response = self.client.get('/modules/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = renderers.msgpack.unpackb(response.content, raw=False)
+        self.assertEqual(data['results'][0]['name'], 'Модуль\u2028"1"')
+
+        # ETag зависит от формата ответа: JSON-клиент не получит 304 на ETag MessagePack
+        etag = response['ETag']
+        response = self.client.get('/modules/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @skipUnless(renderers.msgpack, 'msgpack не установлен')
+    def test_msgpack_parser(self):
+        body = renderers.msgpack.packb({'number': 3, 'name': 'Packed'})
+        response = self.client.post('/modules/create/', data=body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Module.objects.filter(name='Packed').exists())
+
+        response = self.client.post('/modules/create/', data=b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DatabasePoolStatsTest(TestCase):
+    """Тесты просмотра состояния подключений к БД."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_admin_only(self):
+        self.client.force_authenticate(user=User.objects.create_user(email='user@example.com', password='x'))
+        self.assertEqual(self.client.get('/db/pool/').status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(POSTGRES_POOL_MODE='persistent', PROCESS_ROLE='web')
+    def test_stats(self):
+        self.client.force_authenticate(user=User.objects.create_superuser(email='admin@example.com', password='x'))
+        response = self.client.get('/db/pool/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['default']['role'], 'web')
+        self.assertEqual(response.data['default']['mode'], 'persistent')
+        self.assertNotIn('pool', response.data['default'])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_unused_replica_alias_skipped(self):
+        """Псевдоним replica без настроенных реплик не попадает в статистику и не открывает пул."""
+        self.assertIn('replica', settings.DATABASES)
+        self.assertEqual(list(get_pool_stats()), ['default'])
+
+
+class SchemaTest(TestCase):
+    """Тесты кэшированной схемы OpenAPI."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        schema.clear_schema_cache()
+        self.addCleanup(schema.clear_schema_cache)
+        # Предупреждения drf_yasg о представлениях при генерации схемы не относятся к тестам
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_generated_once_and_served_with_etag(self):
+        with mock.patch('config.schema.generate_schema', wraps=schema.generate_schema) as generate:
+            response = self.client.get('/swagger/', {'format': 'openapi'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('/modules/', json.loads(response.content)['paths'])
+            self.assertEqual(self.client.get('/swagger/', {'format': 'openapi'}).content, response.content)
+            not_modified = self.client.get(
+                '/swagger/', {'format': 'openapi'}, headers={'If-None-Match': response['ETag']}
+            )
+            self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(self.client.get('/swagger/', {'format': 'yaml'}).status_code, status.HTTP_200_OK)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(self.client.get('/swagger/').status_code, status.HTTP_200_OK)
+
+    def test_command_output_is_reused(self):
+        out = io.StringIO()
+        call_command('generate_schema', stdout=out)
+        self.assertTrue(schema.schema_path(schema.urlconf_fingerprint()).exists())
+        with mock.patch('config.schema.generate_schema') as generate:
+            response = self.client.get('/swagger/', {'format': 'openapi'})
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_fingerprint_follows_urlconf(self):
+        self.assertEqual(schema.urlconf_fingerprint(), schema.urlconf_fingerprint())
+        self.assertNotEqual(schema.urlconf_fingerprint(), schema.urlconf_fingerprint('modules.urls'))
+
+    def test_fingerprint_follows_source(self):
+        """Изменение сериализатора без изменения маршрутов дает новый файл схемы."""
+        fingerprint = schema.urlconf_fingerprint()
+        serializers_path = Path(settings.BASE_DIR) / 'modules' / 'serializers.py'
+        read_bytes = Path.read_bytes
+
+        def changed(path):
+            content = read_bytes(path)
+            return content + b'\n# changed' if path == serializers_path else content
+
+        schema.clear_schema_cache()
+        with mock.patch.object(Path, 'read_bytes', changed):
+            self.assertNotEqual(schema.urlconf_fingerprint(), fingerprint)
+
+
+class StartupReportTest(TestCase):
+    """Тесты отчета о холодном старте и состава приложений по ролям."""
+
+    def test_web_process_skips_worker_modules(self):
+        out = io.StringIO()
+        call_command('startup_report', roles=['web'], repeat=1, top=50, stdout=out)
+        report = out.getvalue()
+        self.assertIn('Роль web', report)
+        self.assertRegex(report, r'ответ \d{3}')
+        self.assertIn('first_request', report)
+        self.assertNotIn('celery', report)
+        self.assertNotIn('django_celery_beat', report)
+
+    def test_worker_process_skips_web_apps(self):
+        out = io.StringIO()
+        call_command('startup_report', roles=['celery'], repeat=1, stdout=out)
+        report = out.getvalue()
+        self.assertIn('celery_app', report)
+        self.assertNotIn('first_request', report)
+        self.assertNotIn('drf_yasg', report)
+        self.assertNotIn('staticfiles', report)
+
+    def test_invalid_repeat(self):
+        with self.assertRaises(CommandError):
+            call_command('startup_report', repeat=0, stdout=io.StringIO())
+
+
+@override_settings(METRICS_TOKEN='secret', METRICS_DIR='', METRICS_QUERY_BUDGET=0)
+class MetricsTest(TestCase):
+    """Тесты метрик запросов и эндпоинта /metrics."""
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.client = APIClient()
+        Module.objects.create(number=1, name='Module 1')
+
+    def get_metrics(self):
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_request_metrics_by_view(self):
+        self.client.get('/modules/')
+        self.client.get('/modules/')
+        text = self.get_metrics()
+        self.assertIn('http_requests_total{view="modules:modules_all",method="GET",status="200"} 2', text)
+        self.assertIn('http_request_duration_seconds_count{view="modules:modules_all"} 2', text)
+        self.assertIn('http_request_db_queries_bucket{view="modules:modules_all",le="+Inf"} 2', text)
+        self.assertIn('http_response_size_bytes_count{view="modules:modules_all"} 2', text)
+        self.assertIn('modules_cache_requests_total{result="hits"} 1', text)
+
+    def test_db_queries_counted(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/modules/')
+        _, histograms = metrics.merge(metrics.collect())
+        series = histograms[('http_request_db_queries', (('view', 'modules:modules_all'),))]
+        self.assertEqual(series[-1], len(queries))
+
+    def test_serializer_time_recorded(self):
+        user = User.objects.create_user(email='metrics@example.com', password='x')
+        self.client.force_authenticate(user=user)
+        self.client.post('/modules/create/', {'number': 2, 'name': 'Module 2'}, format='json')
+        _, histograms = metrics.merge(metrics.collect())
+        series = histograms[('http_request_serializer_duration_seconds', (('view', 'modules:module_new'),))]
+        self.assertEqual(series[-2], 1)
+        self.assertGreater(series[-1], 0)
+
+    def test_access(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        with override_settings(METRICS_TOKEN=''):
+            self.client.force_login(User.objects.create_superuser(email='metrics-admin@example.com', password='x'))
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_QUERY_BUDGET=1)
+    def test_query_budget_warning(self):
+        with self.assertLogs('config.metrics', 'WARNING') as logs:
+            self.client.get('/modules/')
+        self.assertIn('modules:modules_all', logs.output[0])
+
+    def test_merges_process_files(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            other = metrics.Registry()
+            other.inc('http_requests_total', (('view', 'modules:modules_all'), ('method', 'GET'), ('status', '200')))
+            with open(f'{directory}/1.json', 'w') as file:
+                json.dump(other.snapshot(), file)
+            self.client.get('/modules/')
+            text = self.get_metrics()
+        self.assertIn('http_requests_total{view="modules:modules_all",method="GET",status="200"} 2', text)
+
+
+@skipUnless(not settings.DATABASES['replica'].get('TEST', {}).get('MIRROR'),
+            'Маршрутизация проверяется на отдельной тестовой БД replica, а не на зеркале основной')
+@override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_CHECK_INTERVAL=0)
+class ReplicaRouterTest(TestCase):
+    """Тесты маршрутизации чтения на реплики. Основная БД и replica — две отдельные тестовые БД."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        replicas.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='replica@example.com', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        Module.objects.create(number=1, name='Primary', owner=self.user)
+        Module.objects.using('replica').create(number=1, name='Replica')
+
+    def names(self):
+        return [item['name'] for item in self.client.get('/modules/').data['results']]
+
+    def test_safe_reads_use_replica(self):
+        self.assertEqual(self.names(), ['Replica'])
+        self.assertEqual(self.client.get('/modules/export/').getvalue().decode().count('Replica'), 1)
+
+    def test_write_pins_primary(self):
+        response = self.client.post('/modules/create/', {'number': 2, 'name': 'New'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(settings.DATABASE_PRIMARY_PIN_COOKIE, response.cookies)
+        # Клиент с cookie читает свою запись с основной БД
+        self.assertEqual(self.names(), ['Primary', 'New'])
+
+        del self.client.cookies[settings.DATABASE_PRIMARY_PIN_COOKIE]
+        self.assertEqual(self.names(), ['Replica'])
+
+    def test_unhealthy_replica_ejected(self):
+        with mock.patch.object(connections['replica'], 'ensure_connection', side_effect=OperationalError), \
+                self.assertLogs('config.routers', 'WARNING'):
+            self.assertEqual(self.names(), ['Primary'])
+        # Исключенная реплика не используется до истечения DATABASE_REPLICA_EJECT_SECONDS
+        self.assertEqual(self.names(), ['Primary'])
+        replicas.reset()
+        self.assertEqual(self.names(), ['Replica'])
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'default'])
+    def test_round_robin(self):
+        self.assertEqual({self.names()[0] for _ in range(4)}, {'Primary', 'Replica'})
+
+    def test_outside_request_uses_primary(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Module), 'default')
+        self.assertEqual(Module.objects.get().name, 'Primary')
+
+
+class AsyncModulesViewsTest(TestCase):
+    """Тесты асинхронных представлений модулей."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='async@example.com', password='testpass')
+        self.auth = {'Authorization': f'Bearer {UserTokenObtainPairSerializer.get_token(self.user).access_token}'}
+        for number in range(1, 4):
+            Module.objects.create(number=number, name=f'Module {number}', owner=self.user)
+
+    async def test_list_matches_sync_view(self):
+        response = await self.async_client.get('/async/modules/', {'page': 2, 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = (await sync_to_async(self.client.get)('/modules/', {'page': 2, 'page_size': 2})).json()
+        expected['previous'] = expected['previous'].replace('/modules/', '/async/modules/')
+        self.assertEqual(response.json(), expected)
+
+        response = await self.async_client.get('/async/modules/', {'page': 3, 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_retrieve(self):
+        module = await Module.objects.aget(number=1)
+        response = await self.async_client.get(f'/async/modules/{module.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = await self.async_client.get(f'/async/modules/{module.pk}/', headers=self.auth)
+        self.assertEqual(response.json()['name'], 'Module 1')
+        response = await self.async_client.get('/async/modules/0/', headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_create(self):
+        response = await self.async_client.post(
+            '/async/modules/create/', {'number': 10, 'name': 'Async', 'owner': 999},
+            content_type='application/json', headers=self.auth,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['owner'], self.user.pk)
+        await self.user.arefresh_from_db()
+        self.assertEqual(self.user.module_count, 4)
+
+        response = await self.async_client.post(
+            '/async/modules/create/', {'name': 'No number'}, content_type='application/json', headers=self.auth,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('number', response.json())
+
+    async def test_session_and_basic_auth(self):
+        module = await Module.objects.aget(number=1)
+        basic = {'Authorization': 'Basic ' + b64encode(b'async@example.com:testpass').decode()}
+        response = await self.async_client.get(f'/async/modules/{module.pk}/', headers=basic)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f'/async/modules/{module.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_middleware_keeps_async_chain(self):
+        # Синхронное звено в MIDDLEWARE заставило бы ASGI выполнять представление в потоке
+        async def get_response(request):
+            return None
+
+        self.assertTrue(iscoroutinefunction(ReplicaPinningMiddleware(get_response)))
+
+    @override_settings(MODULES_ASYNC_MAX_CONCURRENCY=0, MODULES_ASYNC_QUEUE_TIMEOUT=0.01)
+    async def test_concurrency_limit(self):
+        response = await self.async_client.get('/async/modules/')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class ModulesSearchTest(TestCase):
+    """Тесты полнотекстового поиска модулей (FTS5 в SQLite, tsvector и триграммы в PostgreSQL)."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Module.objects.create(number=1, name='Основы Python', description='Работа с Django ORM')
+        Module.objects.create(number=2, name='Введение в Django', description='Первый проект')
+        Module.objects.create(number=3, name='Алгоритмы', description='Сортировки и поиск')
+
+    def search(self, q, **params):
+        return self.client.get('/modules/search/', {'q': q, **params})
+
+    def names(self, q):
+        return [item['name'] for item in self.search(q).data['results']]
+
+    def test_ranked_by_name_first(self):
+        response = self.search('django')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.data['results']], ['Введение в Django', 'Основы Python'])
+        self.assertEqual(set(response.data['results'][0]), set(ModuleSerializer().fields))
+
+    def test_word_forms(self):
+        self.assertEqual(self.names('алгоритм'), ['Алгоритмы'])
+
+    def test_index_follows_changes(self):
+        module = Module.objects.get(number=3)
+        module.name = 'Структуры данных'
+        module.save()
+        self.assertEqual(self.names('алгоритм'), [])
+        cache.clear()
+        self.assertEqual(self.names('структуры'), ['Структуры данных'])
+        with self.captureOnCommitCallbacks(execute=True):
+            module.delete()
+        self.assertEqual(self.names('структуры'), [])
+
+    def test_keyset_pagination(self):
+        Module.objects.bulk_create(Module(number=10 + i, name=f'Курс {i}', description='курс' * (i % 3 + 1))
+                                   for i in range(23))
+        response = self.search('курс', page_size=10)
+        seen = [item['id'] for item in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [item['id'] for item in response.data['results']]
+        self.assertEqual(len(seen), 23)
+        self.assertEqual(len(set(seen)), 23)
+
+    def test_invalid_input(self):
+        self.assertEqual(self.search('').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search('django', cursor='bad').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.search('django" OR *(').status_code, status.HTTP_200_OK)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Триграммное сходство есть только в PostgreSQL')
+    def test_typo_tolerance(self):
+        self.assertEqual(self.names('Алгоритны'), ['Алгоритмы'])
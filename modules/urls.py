@@ -1,17 +1,40 @@
 from django.urls import path
 
+from modules.async_views import AsyncModulesListView, AsyncModulesRetrieveView, AsyncModulesCreateView
 from modules.views import ModulesCreateAPIView, ModulesListAPIView, ModulesRetrieveAPIView, ModulesUpdateAPIView, \
-    ModulesDestroyAPIView
+    ModulesDestroyAPIView, ModulesBulkAPIView, ModulesExportAPIView, ModulesImportAPIView, ModulesImportStatusAPIView, \
+    ModulesSearchAPIView, ModulesReorderAPIView, ModulesMineAPIView, ModulesBatchAPIView, ModulesChangesAPIView
 
 urlpatterns = [
     # Создание модуля
     path('modules/create/', ModulesCreateAPIView.as_view(), name='module_new'),
     # Список модулей
     path('modules/', ModulesListAPIView.as_view(), name='modules_all'),
+    # Модули текущего пользователя
+    path('modules/mine/', ModulesMineAPIView.as_view(), name='modules_mine'),
+    # Несколько модулей по списку ID
+    path('modules/batch/', ModulesBatchAPIView.as_view(), name='modules_batch'),
+    # Изменения модулей после токена синхронизации
+    path('modules/changes/', ModulesChangesAPIView.as_view(), name='modules_changes'),
     # Просмотр модуля
     path('modules/<int:pk>/', ModulesRetrieveAPIView.as_view(), name='module_details'),
     # Обновление модуля
     path('modules/update/<int:pk>/', ModulesUpdateAPIView.as_view(), name='module_edit'),
     # Удаление модуля
     path('modules/delete/<int:pk>/', ModulesDestroyAPIView.as_view(), name='module_remove'),
+    # Пакетные операции с модулями
+    path('modules/bulk/', ModulesBulkAPIView.as_view(), name='modules_bulk'),
+    # Изменение порядка модулей
+    path('modules/reorder/', ModulesReorderAPIView.as_view(), name='modules_reorder'),
+    # Полнотекстовый поиск модулей
+    path('modules/search/', ModulesSearchAPIView.as_view(), name='modules_search'),
+    # Потоковая выгрузка модулей
+    path('modules/export/', ModulesExportAPIView.as_view(), name='modules_export'),
+    # Асинхронный импорт модулей
+    path('modules/import/', ModulesImportAPIView.as_view(), name='modules_import'),
+    path('modules/import/<str:task_id>/', ModulesImportStatusAPIView.as_view(), name='modules_import_status'),
+    # Асинхронные (ASGI) версии создания, списка и просмотра модулей
+    path('async/modules/create/', AsyncModulesCreateView.as_view(), name='async_module_new'),
+    path('async/modules/', AsyncModulesListView.as_view(), name='async_modules_all'),
+    path('async/modules/<int:pk>/', AsyncModulesRetrieveView.as_view(), name='async_module_details'),
 ]
\ No newline at end of file
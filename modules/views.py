@@ -1,8 +1,31 @@
-from rest_framework import generics
+import time
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, serializers, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from modules.cache import (
+    IMPORT_OWNER_KEY, CachedResponseMixin, bump_version_on_commit, get_version, owner_version_key
+)
+from modules.conditional import ConditionalGetMixin, make_etag
+from modules.export import FORMATS, iter_chunks, iter_rows
 from modules.models import Module
-from modules.pagination import ModulesPaginator
-from modules.serializers import ModuleSerializer
+from modules.pagination import ModulesPaginator, ModulesCursorPaginator, ModulesSearchPaginator
+from modules.search import search
+from modules.sync import decode_token, encode_token, stable_version, token_expired
+from modules.serializers import ModuleSerializer, ModuleBulkSerializer, ModuleBulkUpdateSerializer, \
+    ModuleImportSerializer, ModuleReorderSerializer, ValuesSerializer, BatchIdsSerializer
+from users.models import User
 
 
 class ModulesCreateAPIView(generics.CreateAPIView):
@@ -27,13 +50,13 @@ class ModulesCreateAPIView(generics.CreateAPIView):
     serializer_class = ModuleSerializer
     permission_classes = [IsAuthenticated]
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        new_module = serializer.save()
-        new_module.owner = self.request.user
-        new_module.save()
+        # Счетчик модулей владельца обновляется сигналом в той же транзакции
+        serializer.save(owner=self.request.user)
 
 
-class ModulesListAPIView(generics.ListAPIView):
+class ModulesListAPIView(ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
     """
     Представление для получения списка модулей.
 
@@ -43,15 +66,98 @@ class ModulesListAPIView(generics.ListAPIView):
     **Метод:**
     - GET
 
+    **Параметры запроса:**
+    - `page`, `page_size` (int, optional): Постраничная навигация (по умолчанию).
+    - `pagination=cursor` (optional): Keyset-пагинация по (number, id) без подсчета общего количества.
+    - `cursor` (str, optional): Непрозрачный курсор из ссылок `next`/`previous`.
+
+    **Заголовки запроса:**
+    - `If-None-Match` (optional): ETag из предыдущего ответа.
+
     **Ответ:**
     - `200 OK`: Список модулей.
+    - `304 Not Modified`: Страница не изменилась.
     """
     serializer_class = ModuleSerializer
+    values_serializer = ValuesSerializer(ModuleSerializer)
     queryset = Module.objects.all()
     pagination_class = ModulesPaginator
+    cursor_pagination_class = ModulesCursorPaginator
+    cache_kind = 'list'
+
+    @property
+    def paginator(self):
+        # Режим пагинации выбирается на каждый запрос: клиенты без курсора продолжают
+        # получать постраничный ответ с `count`
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request is not None else {}
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_etag(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Ключи записей страницы выбираются по индексу без подсчета всей таблицы
+        window = self.paginator.get_window(queryset, request)
+        if window is None:
+            return None
+        state = list(window.values_list('id', 'updated_at'))
+        if isinstance(self.paginator, ModulesCursorPaginator):
+            return make_etag(request, state)
+        # `count` и ссылки постраничного ответа меняются и при изменениях за пределами страницы:
+        # их отражает версия кэша, которая увеличивается при каждой записи модулей
+        return make_etag(request, self.get_cache_version(), state)
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        # ETag входит в ключ кэша, чтобы закэшированное тело всегда соответствовало своему ETag
+        build_response = partial(self.cached_response, request, self.list_values, etag=etag)
+        return self.conditional_response(request, build_response, etag=etag)
+
+    def list_values(self):
+        # Страница выбирается через values() и не проходит через экземпляры модели и ModuleSerializer
+        queryset = self.values_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response([self.values_serializer.to_representation(row) for row in page])
+
+
+class ModulesMineAPIView(ModulesListAPIView):
+    """
+    Представление для получения списка модулей текущего пользователя.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям.
+
+    **Метод:**
+    - GET
+
+    **Параметры запроса:**
+    - Те же, что у `GET /modules/`: `page`, `page_size`, `pagination=cursor`, `cursor`.
+
+    **Ответ:**
+    - `200 OK`: Список модулей пользователя.
+    - `304 Not Modified`: Страница не изменилась.
+    """
+    permission_classes = [IsAuthenticated]
+    cache_kind = 'mine'
+
+    def get_queryset(self):
+        # owner_id, а не owner: пользователь из claims JWT не является экземпляром модели
+        return Module.objects.filter(owner_id=self.request.user.pk)
+
+    def get_cache_version(self):
+        # Кэш владельца не сбрасывается изменениями модулей других пользователей
+        return get_version(owner_version_key(self.request.user.pk))
 
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        build_response = partial(self.cached_response, request, self.list_values, owner=request.user.pk, etag=etag)
+        return self.conditional_response(request, build_response, etag=etag)
 
-class ModulesRetrieveAPIView(generics.RetrieveAPIView):
+
+class ModulesRetrieveAPIView(ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
     """
     Представление для получения одного модуля по ID.
 
@@ -64,13 +170,149 @@ class ModulesRetrieveAPIView(generics.RetrieveAPIView):
     **Параметры пути:**
     - `pk` (int): ID модуля.
 
+    **Заголовки запроса:**
+    - `If-None-Match`, `If-Modified-Since` (optional): ETag и Last-Modified из предыдущего ответа.
+
     **Ответ:**
     - `200 OK`: Информация о модуле.
+    - `304 Not Modified`: Модуль не изменился.
     - `404 Not Found`: Модуль не найден.
     """
     serializer_class = ModuleSerializer
+    values_serializer = ValuesSerializer(ModuleSerializer)
     queryset = Module.objects.all()
     permission_classes = [IsAuthenticated]
+    cache_kind = 'detail'
+
+    def retrieve(self, request, *args, **kwargs):
+        updated_at = self.get_queryset().filter(pk=kwargs['pk']).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404
+        etag = make_etag(request, kwargs['pk'], updated_at)
+        build_response = partial(
+            self.cached_response, request, partial(self.retrieve_values, kwargs['pk']), pk=kwargs['pk'], etag=etag
+        )
+        return self.conditional_response(request, build_response, etag=etag, last_modified=updated_at)
+
+    def retrieve_values(self, pk):
+        row = self.values_serializer.values(self.get_queryset().filter(pk=pk)).first()
+        if row is None:
+            raise Http404
+        self.check_object_permissions(self.request, row)
+        return Response(self.values_serializer.to_representation(row))
+
+
+class ModulesBatchAPIView(generics.GenericAPIView):
+    """
+    Представление для получения нескольких модулей по списку ID одним запросом к БД.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям.
+
+    **Метод:**
+    - GET
+
+    **Параметры запроса:**
+    - `ids` (str): ID модулей через запятую, не больше MODULES_BATCH_MAX_SIZE.
+
+    **Ответ:**
+    - `200 OK`: `results` — модули в порядке `ids` (`null` на месте ненайденных), `missing` — ненайденные ID.
+    - `400 Bad Request`: Неверный или слишком длинный список ID.
+    """
+    serializer_class = ModuleSerializer
+    values_serializer = ValuesSerializer(ModuleSerializer)
+    queryset = Module.objects.all()
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        params = BatchIdsSerializer(data=request.query_params, max_length=settings.MODULES_BATCH_MAX_SIZE)
+        params.is_valid(raise_exception=True)
+        ids = params.validated_data['ids']
+        rows = {row['id']: row for row in self.values_serializer.values(self.get_queryset().filter(pk__in=ids))}
+        for row in rows.values():
+            self.check_object_permissions(request, row)
+        rows = {pk: self.values_serializer.to_representation(row) for pk, row in rows.items()}
+        return Response({
+            'results': [rows.get(pk) for pk in ids],
+            'missing': [pk for pk in ids if pk not in rows],
+        })
+
+
+class ModulesChangesAPIView(generics.GenericAPIView):
+    """
+    Представление для инкрементальной синхронизации: модули, созданные, измененные или удаленные
+    после токена, в порядке версии изменения (индекс module_version_id_idx).
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям.
+
+    **Метод:**
+    - GET
+
+    **Параметры запроса:**
+    - `since` (str, optional): Токен из предыдущего ответа; без него возвращаются все модули.
+    - `page_size` (int, optional): Изменений в ответе, не больше MODULES_SYNC_PAGE_SIZE.
+
+    **Ответ:**
+    - `200 OK`: `updated` — созданные и измененные модули, `deleted` — ID удаленных, `token` — токен для
+      следующего запроса, `has_more` — есть ли еще изменения (запросить сразу с новым токеном).
+    - `400 Bad Request`: Неверный токен.
+    - `410 Gone`: Токен старше MODULES_SYNC_TOMBSTONE_TTL — удаления могли быть очищены, нужна полная синхронизация.
+    """
+    serializer_class = ModuleSerializer
+    values_serializer = ValuesSerializer(ModuleSerializer)
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        page_size = serializers.IntegerField(min_value=1, max_value=settings.MODULES_SYNC_PAGE_SIZE).run_validation(
+            request.query_params.get('page_size', settings.MODULES_SYNC_PAGE_SIZE)
+        )
+        started = time.time()
+        since = request.query_params.get('since')
+        if since:
+            try:
+                version, pk, issued = decode_token(since)
+            except ValueError as exc:
+                raise serializers.ValidationError({'since': [str(exc)]})
+            if token_expired(issued, settings.MODULES_SYNC_TOMBSTONE_TTL):
+                return Response(
+                    {'detail': 'Токен синхронизации устарел. Выполните полную синхронизацию без since.'},
+                    status=status.HTTP_410_GONE,
+                )
+        else:
+            version, pk, issued = -1, 0, started
+
+        db = router.db_for_read(Module)
+        # Граница берется до выборки: изменения ниже нее уже зафиксированы и видны запросу
+        bound = stable_version(connections[db])
+        queryset = Module.all_objects.using(db).filter(Q(version__gt=version) | Q(version=version, id__gt=pk))
+        if bound is not None:
+            queryset = queryset.filter(version__lt=bound)
+        queryset = queryset.order_by('version', 'id').values(*self.values_serializer.fields, 'version', 'deleted_at')
+        rows = list(queryset[:page_size + 1])
+        page, has_more = rows[:page_size], len(rows) > page_size
+
+        updated, deleted = [], []
+        for row in page:
+            row_version, deleted_at = row.pop('version'), row.pop('deleted_at')
+            if deleted_at is None:
+                updated.append(self.values_serializer.to_representation(row))
+            else:
+                deleted.append(row['id'])
+        if page:
+            version, pk = row_version, page[-1]['id']
+        if not has_more:
+            # Все изменения до границы переданы: следующий запрос начнется с нее; удаления
+            # до начала этого запроса клиент уже получил
+            if bound is not None and (bound, 0) > (version, pk):
+                version, pk = bound, 0
+            issued = started
+        return Response({
+            'updated': updated,
+            'deleted': deleted,
+            'token': encode_token(version, pk, issued),
+            'has_more': has_more,
+        })
 
 
 class ModulesUpdateAPIView(generics.UpdateAPIView):
@@ -103,6 +345,10 @@ class ModulesUpdateAPIView(generics.UpdateAPIView):
     def get_queryset(self):
         return Module.objects.filter(owner=self.request.user)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
 
 class ModulesDestroyAPIView(generics.DestroyAPIView):
     """
@@ -118,11 +364,341 @@ class ModulesDestroyAPIView(generics.DestroyAPIView):
     - `pk` (int): ID модуля.
 
     **Ответ:**
-    - `204 No Content`: Модуль успешно удален.
+    - `204 No Content`: Модуль успешно удален (остается tombstone-записью для `GET /modules/changes/`).
     - `403 Forbidden`: У пользователя нет прав на удаление модуля.
     - `404 Not Found`: Модуль не найден.
     """
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Module.objects.filter(owner=self.request.user)
\ No newline at end of file
+        return Module.objects.filter(owner=self.request.user)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+
+class ModulesBulkAPIView(generics.GenericAPIView):
+    """
+    Представление для пакетного создания, обновления и удаления модулей.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям; изменять и удалять можно только свои модули.
+
+    **Методы:**
+    - **POST:** Создание модулей из массива объектов.
+    - **PUT / PATCH:** Полное или частичное обновление модулей; каждый объект содержит `id`.
+    - **DELETE:** Удаление модулей по массиву ID.
+
+    **Ответ:**
+    - `201 Created` / `200 OK`: Созданные или обновленные модули.
+    - `204 No Content`: Модули удалены.
+    - `400 Bad Request`: Ошибки по каждому элементу массива; пакет не применяется целиком.
+    """
+    serializer_class = ModuleBulkSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Module.objects.filter(owner=self.request.user)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('many', True)
+        kwargs.setdefault('max_length', settings.MODULES_BULK_MAX_SIZE)
+        return super().get_serializer(*args, **kwargs)
+
+    @transaction.atomic
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        modules = serializer.save(owner=request.user)
+        # bulk_create не отправляет сигналы: счетчик и кэш обновляются явно
+        User.objects.shift_module_count(request.user.pk, len(modules))
+        bump_version_on_commit(request.user.pk)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def put(self, request, *args, **kwargs):
+        return self.update(request, partial=False)
+
+    def patch(self, request, *args, **kwargs):
+        return self.update(request, partial=True)
+
+    @transaction.atomic
+    def update(self, request, partial):
+        serializer = ModuleBulkUpdateSerializer(
+            data=request.data, many=True, partial=partial, max_length=settings.MODULES_BULK_MAX_SIZE
+        )
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+
+        ids = [item['id'] for item in items]
+        modules = self.get_queryset().select_for_update().in_bulk(ids)
+        errors = self.get_id_errors(ids, modules)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = {'updated_at'}
+        now = timezone.now()
+        for item in items:
+            module = modules[item['id']]
+            for attr, value in item.items():
+                setattr(module, attr, value)
+                fields.add(attr)
+            # bulk_update не вызывает pre_save, поэтому auto_now выставляется вручную
+            module.updated_at = now
+        fields.discard('id')
+        Module.objects.bulk_update(modules.values(), sorted(fields))
+        bump_version_on_commit(request.user.pk)
+        return Response(self.get_serializer([modules[pk] for pk in ids]).data)
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        ids_field = serializers.ListField(
+            child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=settings.MODULES_BULK_MAX_SIZE
+        )
+        ids = ids_field.run_validation(request.data)
+        queryset = self.get_queryset().filter(pk__in=ids)
+        errors = self.get_id_errors(ids, set(queryset.select_for_update().values_list('pk', flat=True)))
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Одним UPDATE, оставляющим tombstone-записи для /modules/changes/; счетчик владельца
+        # и кэш обновляются в ModuleQuerySet.delete без сигналов для каждого модуля
+        queryset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def get_id_errors(ids, found):
+        # Ошибки по индексу элемента — в том же формате, что и ошибки валидации ListSerializer
+        errors, seen = {}, set()
+        for index, pk in enumerate(ids):
+            if pk not in found:
+                errors[index] = {'id': ['Модуль не найден.']}
+            elif pk in seen:
+                errors[index] = {'id': ['ID повторяется в запросе.']}
+            seen.add(pk)
+        return errors
+
+
+class ModulesReorderAPIView(generics.GenericAPIView):
+    """
+    Представление для изменения порядка модулей пользователя.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям; перенумеровываются только их модули.
+
+    **Метод:**
+    - POST
+
+    **Данные запроса (один из вариантов):**
+    - `id` (int) и `position` (int): Модуль получает номер `position`, модули между старым и новым
+      номером сдвигаются на одну позицию.
+    - `order` (list[int]): ID всех модулей пользователя в новом порядке; модули получают номера 1, 2, ...
+
+    **Ответ:**
+    - `200 OK`: Количество модулей, номер которых изменен.
+    - `400 Bad Request`: Неверные данные или модуль не найден.
+    """
+    serializer_class = ModuleReorderSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Module.objects.filter(owner=self.request.user)
+
+    @transaction.atomic
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # Блокировка строки владельца выстраивает перенумерации его модулей в очередь:
+        # сдвиги диапазонов рассчитаны на номера, которые не меняются параллельно
+        User.objects.select_for_update().filter(pk=request.user.pk).first()
+        queryset = self.get_queryset()
+
+        if 'order' in data:
+            ids = data['order']
+            owned = set(queryset.values_list('pk', flat=True))
+            errors = ModulesBulkAPIView.get_id_errors(ids, owned)
+            if not errors and len(owned) != len(ids):
+                errors = {'order': [f'Не указано модулей пользователя: {len(owned) - len(ids)}.']}
+            if errors:
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            updated = queryset.renumber(ids)
+        else:
+            module = queryset.filter(pk=data['id']).first()
+            if module is None:
+                return Response({'id': ['Модуль не найден.']}, status=status.HTTP_400_BAD_REQUEST)
+            updated = queryset.move(module, data['position'])
+
+        if updated:
+            bump_version_on_commit(request.user.pk)
+        return Response({'updated': updated})
+
+
+class ModulesSearchAPIView(CachedResponseMixin, generics.GenericAPIView):
+    """
+    Представление для полнотекстового поиска модулей по названию и описанию.
+
+    В PostgreSQL используются tsvector с GIN-индексом и триграммное сходство названия
+    (находит модули и при опечатках), в SQLite — FTS5.
+
+    **Доступ:**
+    - Доступно всем пользователям.
+
+    **Метод:**
+    - GET
+
+    **Параметры запроса:**
+    - `q` (str): Поисковый запрос.
+    - `page_size` (int, optional): Размер страницы.
+    - `cursor` (str, optional): Курсор из ссылки `next`.
+
+    **Ответ:**
+    - `200 OK`: Модули в порядке убывания релевантности.
+    - `400 Bad Request`: Не задан поисковый запрос.
+    - `404 Not Found`: Неверный курсор.
+    """
+    serializer_class = ModuleSerializer
+    values_serializer = ValuesSerializer(ModuleSerializer)
+    pagination_class = ModulesSearchPaginator
+    cache_kind = 'search'
+
+    def get(self, request, *args, **kwargs):
+        q = serializers.CharField(max_length=200).run_validation(request.query_params.get('q', '')).strip()
+        if not q:
+            raise serializers.ValidationError({'q': ['Поисковый запрос не может быть пустым.']})
+        return self.cached_response(request, partial(self.search, q))
+
+    def search(self, q):
+        page_size = self.paginator.get_page_size(self.request)
+        after = self.paginator.decode_position(self.request)
+        db = router.db_for_read(Module)
+        found = search(connections[db], q, page_size + 1, after=after)
+
+        page, following = found[:page_size], found[page_size:]
+        rows = {row['id']: row for row in self.values_serializer.values(
+            Module.objects.using(db).filter(id__in=[pk for pk, _ in page]))}
+        # Строка могла быть удалена между поиском и выборкой
+        results = [self.values_serializer.to_representation(rows[pk]) for pk, _ in page if pk in rows]
+        next_position = (page[-1][1], page[-1][0]) if following else None
+        return self.paginator.get_search_response(self.request, results, next_position)
+
+
+class ModulesExportAPIView(generics.GenericAPIView):
+    """
+    Представление для потоковой выгрузки модулей.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям.
+
+    **Метод:**
+    - GET
+
+    **Параметры запроса:**
+    - `output` (str, optional): Формат выгрузки — `ndjson` (по умолчанию) или `csv`.
+    - `owner` (int, optional): Выгрузить только модули указанного владельца.
+    - `gzip` (bool, optional): Сжать ответ (`Content-Encoding: gzip`).
+
+    **Ответ:**
+    - `200 OK`: Поток строк в выбранном формате.
+    - `400 Bad Request`: Неверные параметры запроса.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Module.objects.order_by('number', 'id')
+        owner = self.request.query_params.get('owner')
+        if owner is not None:
+            queryset = queryset.filter(owner_id=serializers.IntegerField().run_validation(owner))
+        return queryset
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in FORMATS:
+            raise serializers.ValidationError({'output': [f'Поддерживаемые форматы: {", ".join(FORMATS)}.']})
+        compress = serializers.BooleanField().run_validation(request.query_params.get('gzip', False))
+        encode, content_type, extension = FORMATS[output]
+
+        queryset = self.get_queryset()
+        # БД выбирается сейчас: тело ответа читается уже после выхода из контекста маршрутизации запроса
+        queryset = queryset.using(queryset.db)
+        rows = iter_rows(queryset, settings.MODULES_EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(iter_chunks(encode(rows), compress=compress), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="modules.{extension}"'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        return response
+
+
+class ModulesImportAPIView(generics.GenericAPIView):
+    """
+    Представление для загрузки файла с модулями на асинхронный импорт.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям; импортированные модули принадлежат автору запроса.
+
+    **Метод:**
+    - POST (multipart/form-data)
+
+    **Данные запроса:**
+    - `file` (file): CSV с заголовком `number,name,description` или NDJSON.
+    - `file_format` (str, optional): `csv` или `ndjson`; по умолчанию определяется по расширению файла.
+
+    **Ответ:**
+    - `202 Accepted`: Импорт поставлен в очередь; `status_url` — адрес для опроса состояния.
+    - `400 Bad Request`: Неверные данные в запросе.
+    """
+    serializer_class = ModuleImportSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        file_format = serializer.validated_data['file_format']
+        # Файл сохраняется в общее хранилище, чтобы его прочитал воркер Celery
+        path = default_storage.save(f'imports/{uuid.uuid4().hex}.{file_format}', serializer.validated_data['file'])
+        # Celery импортируется при первой постановке задачи, а не при старте веб-процесса
+        from modules.tasks import import_modules
+
+        task = import_modules.delay(path=path, owner_id=request.user.pk, file_format=file_format)
+        cache.set(IMPORT_OWNER_KEY.format(task.id), request.user.pk, settings.CELERY_RESULT_EXPIRES)
+        status_url = reverse('modules:modules_import_status', kwargs={'task_id': task.id}, request=request)
+        return Response({'task_id': task.id, 'status_url': status_url}, status=status.HTTP_202_ACCEPTED)
+
+
+class ModulesImportStatusAPIView(generics.GenericAPIView):
+    """
+    Представление для получения состояния импорта модулей.
+
+    **Доступ:**
+    - Доступно только авторизованным пользователям, запустившим импорт.
+
+    **Метод:**
+    - GET
+
+    **Параметры пути:**
+    - `task_id` (str): ID задачи импорта.
+
+    **Ответ:**
+    - `200 OK`: Состояние задачи (`PENDING`, `PROGRESS`, `SUCCESS`, `FAILURE`) и ход выполнения.
+    - `404 Not Found`: Импорт другого пользователя или неизвестный ID задачи.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id, *args, **kwargs):
+        from modules.tasks import import_modules
+
+        result = import_modules.AsyncResult(task_id)
+        # Аргументы задачи сохраняются в хранилище результатов (CELERY_RESULT_EXTENDED) при ее старте,
+        # владелец задачи в очереди — в кэше. Неизвестная задача не принадлежит никому
+        if result.kwargs is not None:
+            owner_id = result.kwargs.get('owner_id')
+        else:
+            owner_id = cache.get(IMPORT_OWNER_KEY.format(task_id))
+        if owner_id is None or owner_id != request.user.pk:
+            raise NotFound
+        progress = result.info if isinstance(result.info, dict) else {}
+        data = {'task_id': task_id, 'state': result.state, 'progress': progress}
+        if result.failed():
+            data['error'] = str(result.info)
+        return Response(data)
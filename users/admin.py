@@ -1,8 +1,39 @@
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from config.admin import EstimatedCountAdminMixin
+from modules.models import Module
 from users.models import User
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     # Поля, отображаемые в списке пользователей
-    list_display = ('email', 'first_name', 'last_name', 'is_active', 'is_staff')
\ No newline at end of file
+    list_display = ('email', 'first_name', 'last_name', 'is_active', 'is_staff', 'module_total')
+    # Поиск по email использует триграммный индекс user_email_trgm_idx; по нему же работает
+    # автодополнение владельца в админке модулей
+    search_fields = ('email',)
+    # Уникальный индекс по email: упорядоченные список и результаты автодополнения
+    ordering = ('email',)
+    readonly_fields = ('module_count', 'last_login', 'date_joined')
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if settings.USERS_MODULE_COUNT_DENORMALIZED:
+            return queryset.annotate(module_total=F('module_count'))
+        # Коррелированный подзапрос считается только для строк страницы по индексу module_owner_number_idx;
+        # JOIN с GROUP BY агрегировал бы всю таблицу модулей до LIMIT
+        counts = (
+            Module.objects.filter(owner=OuterRef('pk'))
+            .order_by()
+            .values('owner')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return queryset.annotate(module_total=Coalesce(Subquery(counts), 0))
+
+    @admin.display(description='Количество модулей', ordering='module_total')
+    def module_total(self, obj):
+        return obj.module_total
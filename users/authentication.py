@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, который при USERS_JWT_CLAIMS_USER на чтении (GET, HEAD, OPTIONS)
+    строит пользователя из claims токена без запроса к users.User.
+
+    Такой пользователь — TokenUser с `pk`, `email`, `is_staff` и `is_superuser` из токена;
+    изменение прав или блокировка учетной записи вступает в силу для чтения только
+    после истечения access-токена. Запросы на запись всегда загружают пользователя из БД.
+    """
+
+    def authenticate(self, request):
+        self.use_claims = settings.USERS_JWT_CLAIMS_USER and request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.use_claims and api_settings.USER_ID_CLAIM in validated_token:
+            return TokenUser(validated_token)
+        return super().get_user(validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Асинхронный вариант authenticate для представлений modules.async_views.
+
+        Заголовок и подпись токена проверяются без ввода-вывода, в БД идет только загрузка пользователя.
+        """
+        self.use_claims = settings.USERS_JWT_CLAIMS_USER and request.method in SAFE_METHODS
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if self.use_claims and api_settings.USER_ID_CLAIM in validated_token:
+            return TokenUser(validated_token), validated_token
+        return await sync_to_async(super().get_user)(validated_token), validated_token
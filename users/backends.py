@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+UserModel = get_user_model()
+
+KEY_SALT = 'users.backends.CachedModelBackend'
+
+
+def credentials_key(username, password):
+    # В ключ попадает только HMAC от логина и пароля на SECRET_KEY, сами учетные данные в кэше не хранятся
+    return 'users:auth:' + salted_hmac(KEY_SALT, f'{username}\0{password}', algorithm='sha256').hexdigest()
+
+
+def password_fingerprint(user):
+    # Отпечаток хэша пароля: смена пароля меняет его и делает записи кэша недействительными
+    return salted_hmac(KEY_SALT, user.password, algorithm='sha256').hexdigest()
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который на USERS_AUTH_CACHE_TTL секунд запоминает успешную проверку пароля.
+
+    Повторный вход с теми же учетными данными (BasicAuthentication на каждом запросе) стоит
+    одного SELECT вместо вычисления PBKDF2. Неудачные попытки не кэшируются.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None or not settings.USERS_AUTH_CACHE_TTL:
+            return super().authenticate(request, username, password, **kwargs)
+
+        key = credentials_key(username, password)
+        cached = cache.get(key)
+        if cached is not None:
+            user_id, fingerprint = cached
+            user = UserModel._default_manager.filter(pk=user_id).first()
+            if (user is not None and self.user_can_authenticate(user)
+                    and constant_time_compare(password_fingerprint(user), fingerprint)):
+                return user
+            cache.delete(key)
+
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is not None:
+            cache.set(key, (user.pk, password_fingerprint(user)), settings.USERS_AUTH_CACHE_TTL)
+        return user
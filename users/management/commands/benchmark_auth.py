@@ -0,0 +1,61 @@
+import time
+from base64 import b64encode
+from functools import partial
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.request import Request
+
+from users.authentication import ClaimsJWTAuthentication
+from users.backends import credentials_key
+from users.models import User
+from users.serializers import UserTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = 'Измеряет стоимость аутентификации одного запроса: Basic (без кэша и с кэшем) и JWT (БД и claims).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Количество повторов замера.')
+
+    def handle(self, *args, **options):
+        email, password = 'benchmark-auth@example.com', 'benchmark-pass'
+        factory = RequestFactory()
+        # Пользователь создается в транзакции, которая откатывается после замеров
+        with transaction.atomic():
+            user = User.objects.create_user(email=email, password=password)
+            basic = 'Basic ' + b64encode(f'{email}:{password}'.encode()).decode()
+            bearer = 'Bearer ' + str(UserTokenObtainPairSerializer.get_token(user).access_token)
+
+            def authenticate(authenticator, header):
+                request = Request(factory.get('/modules/', HTTP_AUTHORIZATION=header))
+                assert authenticator().authenticate(request) is not None
+
+            def basic_cold():
+                cache.delete(credentials_key(email, password))
+                authenticate(BasicAuthentication, basic)
+
+            cases = [
+                ('Basic, без кэша', basic_cold),
+                ('Basic, с кэшем', partial(authenticate, BasicAuthentication, basic)),
+                ('JWT, пользователь из БД', partial(authenticate, ClaimsJWTAuthentication, bearer)),
+            ]
+            self.stdout.write(f'{"Способ":<28}{"мс/запрос":>12}')
+            for title, func in cases:
+                self.stdout.write(f'{title:<28}{self.measure(func, options["repeat"]):>12.3f}')
+            with override_settings(USERS_JWT_CLAIMS_USER=True):
+                func = partial(authenticate, ClaimsJWTAuthentication, bearer)
+                self.stdout.write(f'{"JWT, пользователь из claims":<28}{self.measure(func, options["repeat"]):>12.3f}')
+            cache.delete(credentials_key(email, password))
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(func, repeat):
+        func()  # прогрев
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) * 1000 / repeat
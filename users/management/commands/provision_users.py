@@ -0,0 +1,48 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modules.imports import iter_import_rows
+from users.provisioning import create_users, validate_rows
+
+
+class Command(BaseCommand):
+    help = ('Пакетно создает пользователей из CSV (заголовок email,password,first_name,last_name) или NDJSON. '
+            'Пароли хэшируются параллельно, пользователи вставляются пакетами bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .csv или .ndjson.')
+        parser.add_argument('--format', choices=('csv', 'ndjson'), help='Формат файла; по умолчанию по расширению.')
+        parser.add_argument('--batch-size', type=int, help='Строк в одной вставке (USERS_PROVISION_BATCH_SIZE).')
+        parser.add_argument('--workers', type=int, help='Потоков хэширования паролей (USERS_PROVISION_WORKERS).')
+        parser.add_argument('--skip-invalid', action='store_true',
+                            help='Создать пользователей из корректных строк, пропустив ошибочные.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'ndjson'):
+            raise CommandError('Укажите --format: csv или ndjson.')
+
+        try:
+            with path.open('rb') as raw:
+                entries = list(iter_import_rows(raw, file_format))
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f'Не удалось прочитать {path}: {exc}')
+        if not entries:
+            raise CommandError('Файл не содержит строк.')
+
+        # Нечитаемая строка NDJSON приходит как None и получает ошибку валидации
+        valid, errors = validate_rows([row for _, row in entries], options['batch_size'])
+        for index, detail in errors.items():
+            self.stderr.write(f'Строка {entries[index][0]}: {detail}')
+        if errors and not options['skip_invalid']:
+            raise CommandError(
+                f'Ошибок: {len(errors)}. Пользователи не созданы; --skip-invalid пропустит ошибочные строки.'
+            )
+
+        started = time.perf_counter()
+        users = create_users(valid, options['batch_size'], options['workers'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Создано пользователей: {len(users)}, пропущено строк: {len(errors)} за {elapsed:.1f} с')
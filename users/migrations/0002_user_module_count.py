@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_module_count(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Module = apps.get_model('modules', 'Module')
+    counts = (
+        Module.objects.filter(owner=OuterRef('pk'))
+        .order_by()
+        .values('owner')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    User.objects.update(module_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('modules', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='module_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество модулей'),
+        ),
+        migrations.RunPython(fill_module_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:40
+
+from django.db import migrations
+
+
+def create_email_trigram_index(apps, schema_editor):
+    # GIN-индекс по триграммам поддерживает поиск admin `email__icontains` и автодополнение
+    # владельца модулей, которые в PostgreSQL компилируются в UPPER("email"::text) LIKE UPPER(...)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS user_email_trgm_idx '
+        'ON users_user USING gin (UPPER(email::text) gin_trgm_ops)'
+    )
+
+
+def drop_email_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS user_email_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_module_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_trigram_index, drop_email_trigram_index),
+    ]
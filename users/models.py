@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Group, Permission
@@ -44,6 +45,14 @@ class UserManager(BaseUserManager):
 
         return self._create_user(email, password, **extra_fields)
 
+    def shift_module_count(self, user_id, delta):
+        """
+        Сдвигает денормализованный счетчик модулей пользователя одним UPDATE.
+        """
+        if user_id is None or not delta:
+            return
+        self.filter(pk=user_id).update(module_count=F('module_count') + delta)
+
 
 class User(AbstractUser):
     """Модель пользователя"""
@@ -59,6 +68,11 @@ class User(AbstractUser):
     first_name = models.CharField(max_length=50, verbose_name='Имя')
     last_name = models.CharField(max_length=80, verbose_name='Фамилия')
 
+    # Денормализованное количество модулей. Поддерживается сигналами modules.signals при сохранении и удалении
+    # модуля, а пакетными операциями без сигналов (ModuleQuerySet.delete, POST /modules/bulk/, импорт) —
+    # явным вызовом UserManager.shift_module_count
+    module_count = models.PositiveIntegerField(default=0, verbose_name='Количество модулей')
+
     # Настройка обратных связей для групп и разрешений
     groups = models.ManyToManyField(
         Group,
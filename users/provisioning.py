@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from users.models import User
+from users.serializers import UserProvisionSerializer
+
+
+def validate_rows(rows, batch_size=None):
+    """
+    Валидирует строки пакетного создания пользователей.
+
+    Возвращает список провалидированных данных и ошибки по индексу строки. Email проверяется
+    на повтор внутри пакета и на существование в БД — одним запросом на `batch_size` строк.
+    """
+    batch_size = batch_size or settings.USERS_PROVISION_BATCH_SIZE
+    serializer = UserProvisionSerializer()
+    valid, errors = [], {}
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, serializer.run_validation(row)))
+        except ValidationError as exc:
+            errors[index] = exc.detail
+
+    emails = [attrs['email'] for _, attrs in valid]
+    existing = set()
+    for offset in range(0, len(emails), batch_size):
+        existing.update(User.objects.filter(email__in=emails[offset:offset + batch_size]).values_list(
+            'email', flat=True))
+
+    seen, result = set(), []
+    for index, attrs in valid:
+        if attrs['email'] in existing:
+            errors[index] = {'email': ['Пользователь с таким email уже существует.']}
+        elif attrs['email'] in seen:
+            errors[index] = {'email': ['Email повторяется в запросе.']}
+        else:
+            result.append(attrs)
+        seen.add(attrs['email'])
+    return result, dict(sorted(errors.items()))
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Хэширует пароли параллельно. PBKDF2, bcrypt и Argon2 считаются в C без GIL, поэтому
+    потоки загружают все ядра без отдельных процессов.
+    """
+    workers = min(workers or settings.USERS_PROVISION_WORKERS, len(passwords))
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(make_password, passwords))
+
+
+def create_users(rows, batch_size=None, workers=None):
+    """
+    Создает пользователей из провалидированных строк: пароли хэшируются до транзакции,
+    вставка идет одним bulk_create на `batch_size` строк.
+    """
+    batch_size = batch_size or settings.USERS_PROVISION_BATCH_SIZE
+    hashes = hash_passwords([attrs['password'] for attrs in rows], workers)
+    users = [User(**{**attrs, 'password': password_hash}) for attrs, password_hash in zip(rows, hashes)]
+    with transaction.atomic():
+        for offset in range(0, len(users), batch_size):
+            User.objects.bulk_create(users[offset:offset + batch_size])
+    return users
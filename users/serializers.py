@@ -1,4 +1,7 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from users.models import User
 
 
@@ -6,6 +9,12 @@ class UserSerializer(serializers.ModelSerializer):
     module_count = serializers.SerializerMethodField()
 
     def get_module_count(self, instance):
+        # Значение из аннотации UserViewSet.get_queryset — без отдельного запроса на каждую строку
+        annotated = getattr(instance, 'module_total', None)
+        if annotated is not None:
+            return annotated
+        if settings.USERS_MODULE_COUNT_DENORMALIZED:
+            return instance.module_count
         return instance.module.count()
 
     class Meta:
@@ -27,8 +36,33 @@ class UserCreateSerializer(serializers.ModelSerializer):
         extra_kwargs = {'password': {'write_only': True}}
 
     def create(self, validated_data):
-        password = validated_data.pop('password')
-        instance = User.objects.create(**validated_data)
-        instance.set_password(password)
-        instance.save()
-        return instance
+        # Хэш вычисляется до вставки: пользователь сохраняется одним INSERT
+        validated_data['password'] = make_password(validated_data['password'])
+        return User.objects.create(**validated_data)
+
+
+class UserProvisionSerializer(UserCreateSerializer):
+    """
+    Строка пакетного создания пользователей. Уникальность email проверяется для всего пакета
+    одним запросом (users.provisioning.validate_rows), а не запросом на каждую строку.
+    """
+
+    class Meta(UserCreateSerializer.Meta):
+        extra_kwargs = {'password': {'write_only': True}, 'email': {'validators': []}}
+
+    def validate_email(self, value):
+        return User.objects.normalize_email(value)
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Выдает пару токенов с claims, по которым ClaimsJWTAuthentication строит пользователя без запроса к БД.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['email'] = user.email
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
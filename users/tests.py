@@ -1,4 +1,16 @@
-from django.test import TestCase
+import csv
+import io
+import tempfile
+from base64 import b64encode
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from modules.models import Module
 from users.models import User
 from users.serializers import UserSerializer, UserCreateSerializer
 from django.contrib.auth.models import Group, Permission
@@ -220,4 +232,275 @@ class UserCreateSerializerTest(TestCase):
             'permissions': [permission.pk]
         }
         serializer = UserCreateSerializer(data=data)
-        self.assertTrue(serializer.is_valid())
\ No newline at end of file
+        self.assertTrue(serializer.is_valid())
+
+
+class UserModuleCountTest(TestCase):
+    """
+    Тесты получения количества модулей в списке пользователей.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        for i in range(5):
+            user = User.objects.create(email=f'user{i}@example.com', password='test')
+            for number in range(i):
+                Module.objects.create(number=number, name=f'Module {number}', owner=user)
+
+    def test_list_is_constant_query(self):
+        # Количество запросов не зависит от числа пользователей
+        with self.assertNumQueries(1):
+            response = self.client.get('/users/user/')
+        self.assertEqual(response.status_code, 200)
+        counts = {item['email']: item['module_count'] for item in response.data}
+        self.assertEqual(counts['user3@example.com'], 3)
+        self.assertEqual(counts['admin@example.com'], 0)
+
+    def test_retrieve_uses_annotation(self):
+        user = User.objects.get(email='user4@example.com')
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/users/user/{user.pk}/')
+        self.assertEqual(response.data['module_count'], 4)
+
+    def test_deleted_modules_not_counted(self):
+        Module.objects.filter(owner__email='user3@example.com').first().delete()
+        response = self.client.get('/users/user/')
+        counts = {item['email']: item['module_count'] for item in response.data}
+        self.assertEqual(counts['user3@example.com'], 2)
+
+    @override_settings(USERS_MODULE_COUNT_DENORMALIZED=True)
+    def test_denormalized_counter(self):
+        # Счетчик поддерживается при создании и удалении модулей через API
+        user = User.objects.get(email='user1@example.com')
+        self.assertEqual(user.module_count, 1)
+        self.client.force_authenticate(user=user)
+        self.client.post('/modules/create/', {'number': 10, 'name': 'New'}, format='json')
+        user.refresh_from_db()
+        self.assertEqual(user.module_count, 2)
+
+        module = Module.objects.filter(owner=user).latest('pk')
+        self.client.delete(f'/modules/delete/{module.pk}/')
+        user.refresh_from_db()
+        self.assertEqual(user.module_count, 1)
+
+        self.client.force_authenticate(user=self.admin)
+        with self.assertNumQueries(1):
+            self.client.get('/users/user/')
+
+
+class UserAdminTest(TestCase):
+    """
+    Тесты списка пользователей в админке.
+    """
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='adminpass'))
+        for i in range(5):
+            user = User.objects.create(email=f'user{i}@example.com', password='test')
+            for number in range(i):
+                Module.objects.create(number=number, name=f'Module {number}', owner=user)
+
+    def get_changelist(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/users/user/', params or {})
+        self.assertEqual(response.status_code, 200)
+        counts = {user.email: user.module_total for user in response.context['cl'].result_list}
+        return counts, len(queries)
+
+    def test_module_counts_annotated(self):
+        counts, queries = self.get_changelist()
+        self.assertEqual(counts['user3@example.com'], 3)
+        self.assertEqual(counts['admin@example.com'], 0)
+        # Количество запросов не зависит от числа пользователей
+        User.objects.create(email='user5@example.com', password='test')
+        self.assertEqual(self.get_changelist()[1], queries)
+
+        counts, _ = self.get_changelist({'o': '-6'})
+        self.assertEqual(next(iter(counts)), 'user4@example.com')
+
+    @override_settings(USERS_MODULE_COUNT_DENORMALIZED=True)
+    def test_denormalized_counter(self):
+        User.objects.filter(email='user2@example.com').update(module_count=7)
+        self.assertEqual(self.get_changelist()[0]['user2@example.com'], 7)
+
+    def test_search_by_email(self):
+        counts, _ = self.get_changelist({'q': 'user4'})
+        self.assertEqual(counts, {'user4@example.com': 4})
+
+
+class UserBatchTest(TestCase):
+    """
+    Тесты получения нескольких пользователей по списку ID.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpass')
+        self.users = [User.objects.create(email=f'batch{i}@example.com', password='test') for i in range(3)]
+        Module.objects.create(number=1, name='Module', owner=self.users[2])
+        self.client = APIClient()
+
+    def test_admin_only(self):
+        self.assertEqual(self.client.get('/users/user/batch/', {'ids': self.admin.pk}).status_code, 403)
+        self.client.force_authenticate(user=self.users[0])
+        self.assertEqual(self.client.get('/users/user/batch/', {'ids': self.admin.pk}).status_code, 403)
+
+    def test_order_and_missing_in_one_query(self):
+        self.client.force_authenticate(user=self.admin)
+        ids = [self.users[2].pk, 999999, self.users[0].pk]
+        with self.assertNumQueries(1):
+            response = self.client.get('/users/user/batch/', {'ids': ','.join(map(str, ids))})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['email'], 'batch2@example.com')
+        self.assertEqual(response.data['results'][0]['module_count'], 1)
+        self.assertIsNone(response.data['results'][1])
+        self.assertEqual(response.data['results'][2]['email'], 'batch0@example.com')
+        self.assertEqual(response.data['missing'], [999999])
+
+    @override_settings(USERS_BATCH_MAX_SIZE=2)
+    def test_invalid_ids(self):
+        self.client.force_authenticate(user=self.admin)
+        for ids in ('', 'a,1', '1,2,3'):
+            response = self.client.get('/users/user/batch/', {'ids': ids})
+            self.assertEqual(response.status_code, 400, ids)
+            self.assertIn('ids', response.data)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], USERS_PROVISION_WORKERS=4)
+class UserProvisioningTest(TestCase):
+    """
+    Тесты пакетного создания пользователей.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpass')
+        self.client = APIClient()
+
+    @staticmethod
+    def rows(count, start=0):
+        return [{'email': f'student{i}@example.com', 'password': f'pass{i}', 'first_name': 'Student',
+                 'last_name': str(i)} for i in range(start, start + count)]
+
+    def test_single_create_is_one_insert(self):
+        data = {'email': 'single@example.com', 'password': 'pass', 'first_name': 'A', 'last_name': 'B'}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/users/user/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        writes = [query['sql'] for query in context.captured_queries if query['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(User.objects.get(email='single@example.com').check_password('pass'))
+
+    def test_admin_only(self):
+        self.assertEqual(self.client.post('/users/user/bulk/', self.rows(1), format='json').status_code, 403)
+
+    @override_settings(USERS_PROVISION_BATCH_SIZE=2)
+    def test_bulk_create(self):
+        self.client.force_authenticate(user=self.admin)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/users/user/bulk/', self.rows(5), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 5})
+        # Одна проверка email и вставка пакетами по USERS_PROVISION_BATCH_SIZE
+        self.assertEqual(sum(query['sql'].startswith('INSERT') for query in context.captured_queries), 3)
+        user = User.objects.get(email='student3@example.com')
+        self.assertTrue(user.check_password('pass3'))
+        self.assertEqual(user.last_name, '3')
+
+    def test_per_row_errors(self):
+        self.client.force_authenticate(user=self.admin)
+        rows = self.rows(4)
+        rows[1]['email'] = 'not-an-email'
+        rows[2]['email'] = 'admin@example.com'
+        rows[3]['email'] = rows[0]['email']
+        response = self.client.post('/users/user/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {1, 2, 3})
+        self.assertIn('email', response.data[1])
+        self.assertEqual(str(response.data[3]['email'][0]), 'Email повторяется в запросе.')
+        self.assertFalse(User.objects.filter(email__startswith='student').exists())
+
+    @override_settings(USERS_BULK_MAX_SIZE=2)
+    def test_max_size(self):
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.client.post('/users/user/bulk/', self.rows(3), format='json').status_code, 400)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as file:
+            writer = csv.DictWriter(file, fieldnames=['email', 'password', 'first_name', 'last_name'])
+            writer.writeheader()
+            writer.writerows([*self.rows(3), {'email': 'bad', 'password': 'x', 'first_name': 'A', 'last_name': 'B'}])
+            file.flush()
+            stderr = io.StringIO()
+            with self.assertRaises(CommandError):
+                call_command('provision_users', file.name, stderr=stderr, stdout=io.StringIO())
+            self.assertIn('Строка 5', stderr.getvalue())
+            self.assertFalse(User.objects.filter(email__startswith='student').exists())
+
+            call_command('provision_users', file.name, skip_invalid=True, stderr=io.StringIO(), stdout=io.StringIO())
+        self.assertEqual(User.objects.filter(email__startswith='student').count(), 3)
+        self.assertTrue(User.objects.get(email='student2@example.com').check_password('pass2'))
+
+
+class CachedAuthenticationTest(TestCase):
+    """
+    Тесты кэширования проверки пароля и пользователя из claims JWT.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='auth@example.com', password='secret-pass')
+        self.client = APIClient()
+
+    # SessionAuthentication первый в списке, поэтому отказ в аутентификации — 403, а не 401
+    def basic_get(self, password='secret-pass'):
+        credentials = b64encode(f'auth@example.com:{password}'.encode()).decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Basic {credentials}')
+        return self.client.get('/modules/')
+
+    def test_password_checked_once(self):
+        with mock.patch.object(User, 'check_password', autospec=True, side_effect=User.check_password) as check:
+            self.assertEqual(self.basic_get().status_code, 200)
+            self.assertEqual(self.basic_get().status_code, 200)
+        self.assertEqual(check.call_count, 1)
+
+    def test_wrong_password_not_cached(self):
+        self.assertEqual(self.basic_get('wrong').status_code, 403)
+        self.assertEqual(self.basic_get('wrong').status_code, 403)
+        self.assertEqual(self.basic_get().status_code, 200)
+
+    def test_password_change_invalidates(self):
+        self.assertEqual(self.basic_get().status_code, 200)
+        self.user.set_password('new-pass')
+        self.user.save()
+        self.assertEqual(self.basic_get().status_code, 403)
+        self.assertEqual(self.basic_get('new-pass').status_code, 200)
+
+    def test_inactive_user_rejected(self):
+        self.assertEqual(self.basic_get().status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.basic_get().status_code, 403)
+
+    @override_settings(USERS_JWT_CLAIMS_USER=True)
+    def test_jwt_claims_user(self):
+        response = self.client.post('/users/token/', {'email': 'auth@example.com', 'password': 'secret-pass'})
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.data['access'])
+
+        # Чтение проходит без запроса к таблице пользователей
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/modules/').status_code, 200)
+        self.assertFalse([q for q in queries if User._meta.db_table in q['sql']])
+
+        # Запись использует пользователя из БД
+        response = self.client.post('/modules/create/', {'number': 1, 'name': 'Module'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Module.objects.get().owner, self.user)
+
+    @override_settings(USERS_JWT_CLAIMS_USER=True)
+    def test_jwt_claims_staff(self):
+        # Права администратора на чтение берутся из claim is_staff
+        admin = User.objects.create_superuser(email='root@example.com', password='root-pass')
+        for user, password, expected in ((self.user, 'secret-pass', 403), (admin, 'root-pass', 200)):
+            response = self.client.post('/users/token/', {'email': user.email, 'password': password})
+            self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.data['access'])
+            self.assertEqual(self.client.get('/users/user/').status_code, expected)
@@ -1,5 +1,10 @@
-from rest_framework import status
+from django.conf import settings
+from django.db.models import Count, Q
+from rest_framework import serializers, status
+from rest_framework.decorators import action
 from rest_framework.viewsets import ModelViewSet
+from modules.serializers import BatchIdsSerializer
+from users.provisioning import create_users, validate_rows
 from users.models import User
 from users.serializers import UserSerializer, UserCreateSerializer
 from rest_framework.response import Response
@@ -18,6 +23,8 @@ class UserViewSet(ModelViewSet):
     - **GET:** Получение списка пользователей (доступно только администраторам).
     - **POST:** Создание нового пользователя (доступно всем).
     - **GET (pk):** Получение информации о конкретном пользователе (доступно только администраторам).
+    - **GET batch:** Получение нескольких пользователей по `?ids=1,2,3` (доступно только администраторам).
+    - **POST bulk:** Пакетное создание пользователей из массива объектов (доступно только администраторам).
     - **PUT (pk):** Обновление информации о пользователе (доступно только администраторам).
     - **DELETE (pk):** Удаление пользователя (доступно только администраторам).
 
@@ -41,6 +48,14 @@ class UserViewSet(ModelViewSet):
     serializer_class = UserSerializer
     queryset = User.objects.all()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Количество модулей (без удаленных) считается одним агрегирующим запросом, если не используется
+        # денормализованное поле User.module_count
+        if self.action in ('list', 'retrieve', 'batch') and not settings.USERS_MODULE_COUNT_DENORMALIZED:
+            queryset = queryset.annotate(module_total=Count('module', filter=Q(module__deleted_at__isnull=True)))
+        return queryset
+
     def create(self, request, *args, **kwargs):
         serializer = UserCreateSerializer(data=request.data)
         if serializer.is_valid():
@@ -48,6 +63,33 @@ class UserViewSet(ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        # Пакет создается целиком или не создается: ошибки возвращаются по индексу строки
+        rows = serializers.ListField(
+            child=serializers.DictField(), allow_empty=False, max_length=settings.USERS_BULK_MAX_SIZE
+        ).run_validation(request.data)
+        valid, errors = validate_rows(rows)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        users = create_users(valid)
+        return Response({'created': len(users)}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False)
+    def batch(self, request):
+        # Пользователи в порядке ids, null на месте ненайденных; права проверяются как в retrieve
+        params = BatchIdsSerializer(data=request.query_params, max_length=settings.USERS_BATCH_MAX_SIZE)
+        params.is_valid(raise_exception=True)
+        ids = params.validated_data['ids']
+        users = self.get_queryset().in_bulk(ids)
+        for user in users.values():
+            self.check_object_permissions(request, user)
+        data = dict(zip(users, self.get_serializer(users.values(), many=True).data))
+        return Response({
+            'results': [data.get(pk) for pk in ids],
+            'missing': [pk for pk in ids if pk not in users],
+        })
+
     def get_permissions(self):
         # Настройка прав доступа:
         # - Для создания пользователя доступен всем